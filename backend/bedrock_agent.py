@@ -1,11 +1,299 @@
+import asyncio
+import hashlib
 import json
+import logging
 import os
-from typing import Dict, List, Any
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Any, Optional
 from dotenv import load_dotenv
+import httpx
+from pydantic import BaseModel, ConfigDict, ValidationInfo, field_validator
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Finding fields Claude actually needs; snippets and metadata only add tokens
+_PROMPT_FINDING_FIELDS = frozenset(['rule_id', 'message', 'file', 'line', 'severity'])
+_MAX_PROMPT_CRITICAL = 20
+_MAX_PROMPT_WARNINGS = 5
+
+# Responses larger than this are parsed off the event loop in the async path
+_ASYNC_PARSE_THRESHOLD = 64 * 1024
+
+
+def _json_dumps(obj: Any, indent: bool = False) -> str:
+    """Serialize obj to a JSON string, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+    if indent:
+        return json.dumps(obj, indent=2)
+    return json.dumps(obj, separators=(',', ':'))
+
+
+def _json_bytes(obj: Any) -> bytes:
+    """Serialize obj to a UTF-8 JSON request body"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
+
+def _json_loads(data):
+    """Parse JSON text or bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _loads_embedded_json(text: str) -> Optional[Any]:
+    """
+    Parse the JSON object embedded in surrounding text, or return None
+
+    Claude output nearly always holds a single top-level object, so the
+    slice between the first '{' and the last '}' is tried first; the
+    brace scanner only runs when that slice does not parse.
+    """
+    start = text.find('{')
+    end = text.rfind('}')
+    if start == -1 or end <= start:
+        return None
+    try:
+        return _json_loads(text[start:end + 1])
+    except json.JSONDecodeError:
+        pass
+
+    json_block = _extract_json_object(text)
+    if json_block:
+        return _json_loads(json_block)
+    return None
+
+
+class _JsonObjectScanner:
+    """
+    Incremental brace-depth scan for the first balanced {...} object
+
+    Text can be fed in pieces (e.g. streamed deltas); each character is
+    looked at once, skipping braces that appear inside JSON string literals.
+    """
+
+    def __init__(self):
+        self.consumed = 0
+        self.start = -1
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+
+    def feed(self, text: str) -> Optional[int]:
+        """Scan text; return the end offset (exclusive, over everything fed) once the object closes"""
+        offset = self.consumed
+        self.consumed += len(text)
+        i = 0
+        if self.start == -1:
+            i = text.find('{')
+            if i == -1:
+                return None
+            self.start = offset + i
+
+        for i in range(i, len(text)):
+            ch = text[i]
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == '\\':
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif ch == '"':
+                self.in_string = True
+            elif ch == '{':
+                self.depth += 1
+            elif ch == '}':
+                self.depth -= 1
+                if self.depth == 0:
+                    return offset + i + 1
+        return None
+
+
+def _extract_json_object(text: str) -> Optional[str]:
+    """Return the first balanced {...} object in text, or None"""
+    scanner = _JsonObjectScanner()
+    end = scanner.feed(text)
+    if end is None:
+        return None
+    return text[scanner.start:end]
+
+
+def _format_findings(findings: List[Dict], limit: int) -> str:
+    """Serialize up to `limit` findings compactly, keeping only prompt-relevant fields"""
+    slim = [
+        {k: v for k, v in finding.items() if k in _PROMPT_FINDING_FIELDS}
+        for finding in findings[:limit]
+    ]
+    text = _json_dumps(slim)
+    if len(findings) > limit:
+        text += f"\n... and {len(findings) - limit} more"
+    return text
+
+
+def _bucket_findings(findings: List[Dict]) -> Dict[str, List[Dict]]:
+    """Split a flat findings list by severity in one pass; unknown severities count as INFO"""
+    buckets = {"ERROR": [], "WARNING": [], "INFO": []}
+    info = buckets["INFO"]
+    for finding in findings:
+        buckets.get(str(finding.get('severity', 'INFO')).upper(), info).append(finding)
+    return buckets
+
+
+@dataclass(slots=True)
+class _ScanView:
+    """Severity buckets and prompt JSON pulled out of scan_results once per analysis"""
+    total_findings: int
+    errors: List[Dict]
+    warnings: List[Dict]
+    info_count: int
+    errors_json: str
+    warnings_json: str
+
+    @classmethod
+    def from_scan(cls, scan_results: Dict) -> "_ScanView":
+        by_severity = scan_results.get('by_severity')
+        if by_severity is None:
+            # Flat form, e.g. findings already merged for storage
+            by_severity = _bucket_findings(scan_results.get('findings') or [])
+        errors = by_severity.get('ERROR') or []
+        warnings = by_severity.get('WARNING') or []
+        info_count = len(by_severity.get('INFO') or [])
+        return cls(
+            total_findings=scan_results.get('total_findings', len(errors) + len(warnings) + info_count),
+            errors=errors,
+            warnings=warnings,
+            info_count=info_count,
+            errors_json=_format_findings(errors, _MAX_PROMPT_CRITICAL),
+            warnings_json=_format_findings(warnings, _MAX_PROMPT_WARNINGS)
+        )
+
+    @property
+    def is_clean(self) -> bool:
+        """True when there is nothing at ERROR or WARNING level to analyze"""
+        return not self.errors and not self.warnings
+
+
+class _LenientModel(BaseModel):
+    """
+    Base for parsed Claude output: off-shape fields are coerced rather than
+    rejected, so one bad value doesn't throw away the whole response
+    """
+    model_config = ConfigDict(extra="allow")
+
+    @field_validator("*", mode="before")
+    @classmethod
+    def _coerce(cls, value: Any, info: ValidationInfo) -> Any:
+        annotation = cls.model_fields[info.field_name].annotation
+        if value is None:
+            return cls.model_fields[info.field_name].get_default(call_default_factory=True)
+        if annotation is str:
+            return value if isinstance(value, str) else _json_dumps(value)
+        # List fields: wrap a lone item, flatten nesting, drop items of the wrong shape
+        items = value if isinstance(value, (list, tuple)) else [value]
+        flat = []
+        for item in items:
+            flat.extend(item if isinstance(item, (list, tuple)) else [item])
+        if annotation == List[Dict[str, Any]]:
+            flat = [item for item in flat if isinstance(item, dict)]
+        return flat
+
+
+class AnalysisResult(_LenientModel):
+    """Parsed security analysis; missing keys get defaults, extra keys are kept"""
+
+    executive_summary: str = "Analysis completed"
+    critical_issues: List[Dict[str, Any]] = []
+    recommended_actions: List[Any] = []
+    tools_to_use: List[Dict[str, Any]] = []
+    raw_response: str = ""
+
+
+class CodeFixResult(_LenientModel):
+    """Parsed code fix response; missing keys get defaults, extra keys are kept"""
+
+    summary: str = "Code fixes generated"
+    file_changes: List[Dict[str, Any]] = []
+    additional_files: List[Dict[str, Any]] = []
+    commit_message: str = "security: fix vulnerabilities"
+    raw_response: str = ""
+
+
+class LLMCache:
+    """
+    Exact-match cache for Claude API responses
+    Keeps entries in memory by default, or in Redis when a URL is configured
+    """
+
+    def __init__(self, ttl: int = 3600, maxsize: int = 1024, redis_url: Optional[str] = None):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._store: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._redis = None
+
+        if redis_url:
+            try:
+                import redis
+                self._redis = redis.Redis.from_url(redis_url)
+            except ImportError:
+                logger.warning("⚠️ redis package not installed - using in-memory LLM cache")
+
+    @staticmethod
+    def make_key(model: str, max_tokens: int, system: Optional[str], prompt: str) -> str:
+        """Build the cache key for a request"""
+        return hashlib.sha256(f"{model}|{max_tokens}|{system or ''}|{prompt}".encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the cached response for key, or None on a miss"""
+        if self._redis is not None:
+            try:
+                data = self._redis.get(key)
+                return _json_loads(data) if data else None
+            except Exception as e:
+                logger.warning("⚠️ LLM cache read failed: %s", e)
+                return None
+
+        with self._lock:
+            entry = self._store.get(key)
+            if entry is None:
+                return None
+            expires_at, response = entry
+            if expires_at < time.monotonic():
+                del self._store[key]
+                return None
+            return response
+
+    def put(self, key: str, response: Dict):
+        """Store a response under key"""
+        if self._redis is not None:
+            try:
+                self._redis.set(key, _json_bytes(response), ex=self.ttl)
+            except Exception as e:
+                logger.warning("⚠️ LLM cache write failed: %s", e)
+            return
+
+        with self._lock:
+            if key not in self._store and len(self._store) >= self.maxsize:
+                # Evict the oldest entry (dicts keep insertion order)
+                self._store.pop(next(iter(self._store)))
+            self._store[key] = (time.monotonic() + self.ttl, response)
+
 
 class BedrockAgentCore:
     """
@@ -13,7 +301,102 @@ class BedrockAgentCore:
     Direct API integration replacing AWS Bedrock for faster development
     """
 
-    def __init__(self):
+    # Static instructions sent as a cached system block; only scan data varies per call
+    _ANALYSIS_SCHEMA = """{
+    "executive_summary": "2-3 sentence summary of findings",
+    "critical_issues": [
+        {
+            "title": "Short descriptive title",
+            "severity": "CRITICAL|HIGH|MEDIUM|LOW",
+            "file": "file path",
+            "line": line_number,
+            "description": "Clear description of the vulnerability",
+            "business_impact": "Business impact explanation",
+            "recommended_fix": "Specific code fix recommendation",
+            "compliance_mapping": ["OWASP", "SOC 2", "etc"]
+        }
+    ],
+    "recommended_actions": [
+        "Prioritized list of actions to take"
+    ],
+    "tools_to_use": [
+        {"tool": "tool_name", "priority": 1}
+    ]
+}"""
+
+    _ANALYSIS_FOCUS = """Focus on:
+1. The most critical security issues (top 3)
+2. Actionable, developer-friendly recommendations
+3. Business impact and compliance implications
+4. Specific code fixes where possible"""
+
+    _ANALYSIS_SYSTEM = (
+        "You are a senior DevSecOps security analyst. Analyze the security scan results "
+        "provided by the user and provide actionable recommendations.\n\n"
+        "Please provide your analysis in JSON format with this exact structure:\n"
+        + _ANALYSIS_SCHEMA + "\n\n" + _ANALYSIS_FOCUS + "\n\n"
+        "Respond ONLY with the JSON - no additional text or formatting."
+    )
+
+    _BATCH_ANALYSIS_SYSTEM = (
+        "You are a senior DevSecOps security analyst. The user provides several numbered "
+        "security scan results, one per repository. Analyze each one independently and "
+        "provide actionable recommendations.\n\n"
+        "Return a JSON object of the form {\"results\": [...]} containing exactly one "
+        "analysis per scan, in the same order as the scans. Each analysis must have this "
+        "exact structure:\n"
+        + _ANALYSIS_SCHEMA + "\n\n" + _ANALYSIS_FOCUS + "\n\n"
+        "Respond ONLY with the JSON - no additional text or formatting."
+    )
+
+    _FIX_SYSTEM = """You are an expert software security engineer. Generate specific code fixes for the security vulnerabilities provided by the user.
+
+For each vulnerability, provide the exact code changes needed. Return your response in this JSON format:
+
+{
+    "summary": "Brief summary of fixes applied",
+    "file_changes": [
+        {
+            "file_path": "path/to/file.py",
+            "issue_type": "sql-injection|xss|hardcoded-secrets|etc",
+            "description": "What this fix addresses",
+            "changes": [
+                {
+                    "line_start": 10,
+                    "line_end": 15,
+                    "old_code": "exact old code here",
+                    "new_code": "exact new secure code here",
+                    "explanation": "why this fix works"
+                }
+            ]
+        }
+    ],
+    "additional_files": [
+        {
+            "file_path": "new/security/config.py",
+            "content": "complete file content if new file needed",
+            "purpose": "what this new file does"
+        }
+    ],
+    "commit_message": "security: fix vulnerabilities in authentication and input validation"
+}
+
+Requirements:
+1. Provide EXACT code replacements - include proper indentation
+2. Focus on the most critical security issues first
+3. Ensure fixes don't break existing functionality
+4. Add security best practices (input validation, sanitization, etc.)
+5. Include proper error handling where needed
+6. Use secure coding patterns for the detected language
+
+Respond ONLY with valid JSON - no additional text."""
+
+    def __init__(self, *, verify_connection: bool = False, session: Optional[requests.Session] = None):
+        """
+        Args:
+            verify_connection: Issue a test API call during construction
+            session: Pre-built HTTP session (e.g. a mock in tests)
+        """
         self.api_key = os.getenv('ANTHROPIC_API_KEY')
 
         if not self.api_key:
@@ -24,29 +407,67 @@ class BedrockAgentCore:
         self.model = "claude-3-5-haiku-20241022"
         self.max_tokens = 4000
 
-        print(f"✓ Claude API client initialized with model: {self.model}")
+        # Static request headers, built once and shared by the sync and async clients
+        self._headers = {
+            "Content-Type": "application/json",
+            "x-api-key": self.api_key,
+            "anthropic-version": "2023-06-01",
+            "anthropic-beta": "prompt-caching-2024-07-31"
+        }
+
+        # Persistent session so every call reuses the same keep-alive connection
+        if session is None:
+            session = requests.Session()
+            session.headers.update(self._headers)
+            adapter = HTTPAdapter(
+                pool_connections=4,
+                pool_maxsize=8,
+                max_retries=Retry(
+                    total=3,
+                    backoff_factor=0.5,
+                    status_forcelist=(429, 500, 502, 503, 504),
+                    allowed_methods=frozenset(['POST'])
+                )
+            )
+            session.mount("https://", adapter)
+        self.session = session
+        self._verified = False
+
+        # Optional response cache for repeated identical prompts
+        self.cache = None
+        if os.getenv('CLAUDE_CACHE_ENABLED', 'false').lower() in ('1', 'true', 'yes'):
+            self.cache = LLMCache(
+                ttl=int(os.getenv('CLAUDE_CACHE_TTL', '3600')),
+                redis_url=os.getenv('CLAUDE_CACHE_REDIS_URL')
+            )
 
-        # Test connection
-        self._test_connection()
+        # Async client is created lazily, one per event loop
+        self._aclient = None
+        self._aclient_loop = None
+
+        logger.info("✓ Claude API client initialized with model: %s", self.model)
+
+        # The connection is otherwise confirmed by the first real API call
+        if verify_connection:
+            self._test_connection()
 
     def _test_connection(self):
         """Test if the Claude API is working"""
         try:
-            response = self._call_claude_api("Hello, can you confirm you're working?")
+            response = self._call_claude_api(None, "Hello, can you confirm you're working?")
 
-            if response and "content" in response:
-                print("✓ Claude API connection successful!")
-            else:
-                print("⚠️ Unexpected response format from Claude API")
+            if not response or "content" not in response:
+                logger.warning("⚠️ Unexpected response format from Claude API")
 
         except Exception as e:
-            print(f"⚠️ Claude API connection test failed: {e}")
+            logger.warning("⚠️ Claude API connection test failed: %s", e)
 
     def analyze_security_findings(
         self,
         scan_results: Dict,
         repo_context: Dict,
-        available_tools: List[Dict] = None
+        available_tools: List[Dict] = None,
+        on_token: Optional[Callable[[str], None]] = None
     ) -> Dict:
         """
         Use Claude to analyze security findings and decide actions
@@ -55,71 +476,290 @@ class BedrockAgentCore:
             scan_results: Output from Semgrep scanner
             repo_context: Repository metadata (name, branch, commit)
             available_tools: List of tools the agent can use (optional)
+            on_token: Callback receiving each streamed text chunk (optional)
 
         Returns:
             Agent's analysis and recommended actions
         """
-        print("🤖 Starting Claude security analysis...")
+        view = _ScanView.from_scan(scan_results)
+        if view.is_clean:
+            return self._clean_scan_result(repo_context)
+
+        logger.info("🤖 Starting Claude security analysis...")
 
         if available_tools is None:
             available_tools = []
 
         try:
             # Build the analysis prompt
-            prompt = self._build_analysis_prompt(scan_results, repo_context, available_tools)
+            prompt = self._build_analysis_prompt(view, repo_context, available_tools)
 
             # Call Claude API
-            response = self._call_claude_api(prompt)
+            response = self._call_claude_api(self._ANALYSIS_SYSTEM, prompt, stream=True, on_token=on_token)
 
             # Parse the response
             analysis = self._parse_claude_response(response)
 
-            print("✓ Claude security analysis complete")
+            logger.info("✓ Claude security analysis complete")
             return analysis
 
         except Exception as e:
-            print(f"❌ Claude analysis error: {e}")
+            logger.error("❌ Claude analysis error: %s", e)
             # Fallback to basic analysis
-            return self._fallback_analysis(scan_results, repo_context)
+            return self._fallback_analysis(view, repo_context)
 
-    def generate_code_fixes(self, security_issues: List[Dict], repo_context: Dict) -> Dict:
+    def analyze_security_findings_batch(self, items: List[tuple], max_items: int = 8) -> List[Dict]:
+        """
+        Analyze several repositories' scan results with one Claude call per batch
+
+        Args:
+            items: List of (scan_results, repo_context) tuples
+            max_items: Maximum number of scans sent in a single request
+
+        Returns:
+            List of analyses in the same order as items
+        """
+        analyses: List[Optional[Dict]] = [None] * len(items)
+        pending = []
+        for i, (scan_results, repo_context) in enumerate(items):
+            view = _ScanView.from_scan(scan_results)
+            if view.is_clean:
+                analyses[i] = self._clean_scan_result(repo_context)
+            else:
+                pending.append((i, view, repo_context))
+
+        for start in range(0, len(pending), max_items):
+            chunk = pending[start:start + max_items]
+            results = self._analyze_batch([(view, repo_context) for _, view, repo_context in chunk])
+            for (i, _, _), analysis in zip(chunk, results):
+                analyses[i] = analysis
+        return analyses
+
+    def _analyze_batch(self, views: List[tuple]) -> List[Dict]:
+        """Send one batch of (view, repo_context) pairs to Claude and split the combined response"""
+        logger.info("🤖 Starting batched Claude analysis of %s scans...", len(views))
+
+        try:
+            sections = []
+            for i, (view, repo_context) in enumerate(views, 1):
+                sections.append(f"=== Scan #{i} ===\n{self._build_analysis_context(view, repo_context)}")
+            prompt = "Analyze the following security scan results.\n\n" + "\n".join(sections)
+
+            response = self._call_claude_api(self._BATCH_ANALYSIS_SYSTEM, prompt)
+            response_text = response["content"][0]["text"]
+
+            try:
+                parsed = _json_loads(response_text)
+            except json.JSONDecodeError:
+                parsed = _loads_embedded_json(response_text)
+                if parsed is None:
+                    raise ValueError("Could not extract JSON from batch response")
+
+            results = parsed.get("results", [])
+            analyses = []
+            for i, (view, repo_context) in enumerate(views):
+                # Validate each item on its own so one bad entry only costs its own scan
+                try:
+                    if not (i < len(results) and isinstance(results[i], dict)):
+                        raise ValueError(f"Missing result #{i + 1} in batch response")
+                    analyses.append(self._normalize_analysis(
+                        {**results[i], "raw_response": _json_dumps(results[i])}
+                    ))
+                except Exception as e:
+                    logger.warning("⚠️ Batch result #%s unusable: %s", i + 1, e)
+                    analyses.append(self._fallback_analysis(view, repo_context))
+
+            logger.info("✓ Batched Claude analysis complete")
+            return analyses
+
+        except Exception as e:
+            logger.error("❌ Batched Claude analysis error: %s", e)
+            return [self._fallback_analysis(view, repo_context) for view, repo_context in views]
+
+    def generate_code_fixes(
+        self,
+        security_issues: List[Dict],
+        repo_context: Dict,
+        on_token: Optional[Callable[[str], None]] = None
+    ) -> Dict:
         """
         Generate actual code fixes for security vulnerabilities
 
         Args:
             security_issues: List of security issues from analysis
             repo_context: Repository metadata and context
+            on_token: Callback receiving each streamed text chunk (optional)
 
         Returns:
             Dictionary containing code fixes with diffs for each file
         """
-        print("🔧 Generating code fixes with Claude...")
+        if not security_issues:
+            return self._clean_code_fixes()
+
+        logger.info("🔧 Generating code fixes with Claude...")
 
         try:
             # Build the code fix prompt
             prompt = self._build_code_fix_prompt(security_issues, repo_context)
 
             # Call Claude API for code generation
-            response = self._call_claude_api(prompt)
+            response = self._call_claude_api(self._FIX_SYSTEM, prompt, stream=True, on_token=on_token)
 
             # Parse the code fix response
             fixes = self._parse_code_fix_response(response)
 
-            print(f"✓ Generated fixes for {len(fixes.get('file_changes', []))} files")
+            logger.info("✓ Generated fixes for %s files", len(fixes.get('file_changes', [])))
             return fixes
 
         except Exception as e:
-            print(f"❌ Code fix generation error: {e}")
+            logger.error("❌ Code fix generation error: %s", e)
             return self._fallback_code_fixes(security_issues, repo_context)
 
-    def _call_claude_api(self, prompt: str) -> Dict:
-        """Make API call to Anthropic Claude"""
-        headers = {
-            "Content-Type": "application/json",
-            "x-api-key": self.api_key,
-            "anthropic-version": "2023-06-01"
+    async def aanalyze_security_findings(
+        self,
+        scan_results: Dict,
+        repo_context: Dict,
+        available_tools: List[Dict] = None,
+        view: Optional[_ScanView] = None
+    ) -> Dict:
+        """Async variant of analyze_security_findings; pass `view` to reuse an existing _ScanView"""
+        if view is None:
+            # Prompt building serializes findings; keep it off the event loop
+            view = await asyncio.to_thread(_ScanView.from_scan, scan_results)
+        if view.is_clean:
+            return self._clean_scan_result(repo_context)
+
+        logger.info("🤖 Starting Claude security analysis...")
+
+        if available_tools is None:
+            available_tools = []
+
+        try:
+            prompt = await asyncio.to_thread(self._build_analysis_prompt, view, repo_context, available_tools)
+            response = await self._acall_claude_api(self._ANALYSIS_SYSTEM, prompt)
+            if self._response_size(response) > _ASYNC_PARSE_THRESHOLD:
+                analysis = await asyncio.to_thread(self._parse_claude_response, response)
+            else:
+                analysis = self._parse_claude_response(response)
+
+            logger.info("✓ Claude security analysis complete")
+            return analysis
+
+        except Exception as e:
+            logger.error("❌ Claude analysis error: %s", e)
+            return self._fallback_analysis(view, repo_context)
+
+    async def agenerate_code_fixes(self, security_issues: List[Dict], repo_context: Dict) -> Dict:
+        """Async variant of generate_code_fixes"""
+        if not security_issues:
+            return self._clean_code_fixes()
+
+        logger.info("🔧 Generating code fixes with Claude...")
+
+        try:
+            prompt = self._build_code_fix_prompt(security_issues, repo_context)
+            response = await self._acall_claude_api(self._FIX_SYSTEM, prompt)
+            if self._response_size(response) > _ASYNC_PARSE_THRESHOLD:
+                fixes = await asyncio.to_thread(self._parse_code_fix_response, response)
+            else:
+                fixes = self._parse_code_fix_response(response)
+
+            logger.info("✓ Generated fixes for %s files", len(fixes.get('file_changes', [])))
+            return fixes
+
+        except Exception as e:
+            logger.error("❌ Code fix generation error: %s", e)
+            return self._fallback_code_fixes(security_issues, repo_context)
+
+    async def analyze_and_fix(self, scan_results: Dict, repo_context: Dict) -> Dict:
+        """
+        Run security analysis and code fix generation concurrently
+
+        Code fixes are generated straight from the scanner's critical findings,
+        so neither request has to wait on the other.
+
+        Args:
+            scan_results: Output from Semgrep scanner
+            repo_context: Repository metadata (name, branch, commit)
+
+        Returns:
+            Dictionary with "analysis" and "code_fixes" results
+        """
+        # Built once, off the event loop, and shared by both requests
+        view = await asyncio.to_thread(_ScanView.from_scan, scan_results)
+        analysis_task = asyncio.create_task(
+            self.aanalyze_security_findings(scan_results, repo_context, view=view)
+        )
+        fixes_task = asyncio.create_task(
+            self.agenerate_code_fixes(self._critical_issues_from_scan(view), repo_context)
+        )
+        analysis, code_fixes = await asyncio.gather(analysis_task, fixes_task)
+
+        return {
+            "analysis": analysis,
+            "code_fixes": code_fixes
         }
 
+    def run_analyze_and_fix(self, scan_results: Dict, repo_context: Dict) -> Dict:
+        """Synchronous wrapper around analyze_and_fix for non-async callers"""
+        async def _run():
+            try:
+                return await self.analyze_and_fix(scan_results, repo_context)
+            finally:
+                await self.aclose()
+
+        return asyncio.run(_run())
+
+    async def aclose(self):
+        """Close the async HTTP client if one was created"""
+        if self._aclient is not None:
+            await self._aclient.aclose()
+            self._aclient = None
+            self._aclient_loop = None
+
+    async def _get_aclient(self) -> httpx.AsyncClient:
+        """
+        Return the AsyncClient for the running event loop, creating it once per loop.
+        A client left over from an earlier loop is closed so its pool isn't leaked.
+        """
+        loop = asyncio.get_running_loop()
+        if self._aclient is None or self._aclient_loop is not loop:
+            # Swap before awaiting so concurrent callers on this loop share the new client
+            stale = self._aclient
+            self._aclient = httpx.AsyncClient(
+                http2=True,
+                timeout=60,
+                headers=self._headers
+            )
+            self._aclient_loop = loop
+            if stale is not None:
+                try:
+                    await stale.aclose()
+                except Exception as e:
+                    # Its connections belong to the old (possibly closed) loop
+                    logger.debug("Discarding stale async client: %s", e)
+        return self._aclient
+
+    def _mark_verified(self):
+        """Report the API connection as working after the first successful call"""
+        if not self._verified:
+            self._verified = True
+            logger.info("✓ Claude API connection successful!")
+
+    @staticmethod
+    def _response_size(response: Dict) -> int:
+        """Length of the text carried by a Messages API response"""
+        return sum(len(block.get("text", "")) for block in response.get("content", []))
+
+    def _cache_lookup(self, system: Optional[str], prompt: str) -> tuple:
+        """Return (cache_key, cached_response); both None when caching is disabled"""
+        if self.cache is None:
+            return None, None
+        cache_key = self.cache.make_key(self.model, self.max_tokens, system, prompt)
+        return cache_key, self.cache.get(cache_key)
+
+    def _build_payload(self, system: Optional[str], prompt: str) -> Dict:
+        """Build the Messages API request payload"""
         payload = {
             "model": self.model,
             "max_tokens": self.max_tokens,
@@ -131,81 +771,152 @@ class BedrockAgentCore:
             ]
         }
 
+        if system:
+            # Mark the static instructions as cacheable so repeat calls skip re-billing them
+            payload["system"] = [
+                {
+                    "type": "text",
+                    "text": system,
+                    "cache_control": {"type": "ephemeral"}
+                }
+            ]
+
+        return payload
+
+    async def _acall_claude_api(self, system: Optional[str], prompt: str) -> Dict:
+        """Make async API call to Anthropic Claude"""
+        cache_key, cached = self._cache_lookup(system, prompt)
+        if cached is not None:
+            return cached
+
+        payload = self._build_payload(system, prompt)
+
+        try:
+            client = await self._get_aclient()
+            response = await client.post(self.api_url, content=_json_bytes(payload))
+
+            if response.status_code != 200:
+                logger.error("❌ Claude API Error %s", response.status_code)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("payload=%s", _json_dumps(payload))
+                logger.error("Response: %s", response.text)
+
+            response.raise_for_status()
+            result = _json_loads(response.content)
+            self._mark_verified()
+            if cache_key:
+                self.cache.put(cache_key, result)
+            return result
+
+        except httpx.HTTPError as e:
+            logger.error("❌ Detailed error: %s", e)
+            raise Exception(f"Claude API call failed: {e}")
+
+    def _call_claude_api(
+        self,
+        system: Optional[str],
+        prompt: str,
+        stream: bool = False,
+        on_token: Optional[Callable[[str], None]] = None
+    ) -> Dict:
+        """
+        Make API call to Anthropic Claude
+
+        With stream=True the response is read as server-sent events and
+        returned as soon as a complete JSON object has arrived.
+        """
+        cache_key, cached = self._cache_lookup(system, prompt)
+        if cached is not None:
+            return cached
+
+        payload = self._build_payload(system, prompt)
+        if stream:
+            payload["stream"] = True
+
         try:
-            response = requests.post(
+            response = self.session.post(
                 self.api_url,
-                headers=headers,
-                json=payload,
-                timeout=60
+                data=_json_bytes(payload),
+                timeout=60,
+                stream=stream
             )
 
-            # Print detailed error info for debugging
             if response.status_code != 200:
-                print(f"❌ Claude API Error {response.status_code}")
-                print(f"Request payload: {json.dumps(payload, indent=2)}")
-                print(f"Response: {response.text}")
+                logger.error("❌ Claude API Error %s", response.status_code)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("payload=%s", _json_dumps(payload))
+                logger.error("Response: %s", response.text)
 
             response.raise_for_status()
-            return response.json()
+            if stream and response.headers.get("Content-Type", "").startswith("text/event-stream"):
+                result = self._read_stream(response, on_token)
+            else:
+                result = _json_loads(response.content)
+            self._mark_verified()
+            if cache_key:
+                self.cache.put(cache_key, result)
+            return result
 
         except requests.RequestException as e:
-            print(f"❌ Detailed error: {e}")
+            logger.error("❌ Detailed error: %s", e)
             if hasattr(e, 'response') and e.response is not None:
-                print(f"Response text: {e.response.text}")
+                logger.error("Response text: %s", e.response.text)
             raise Exception(f"Claude API call failed: {e}")
 
-    def _build_analysis_prompt(self, scan_results: Dict, repo_context: Dict, available_tools: List[Dict]) -> str:
+    def _read_stream(self, response, on_token: Optional[Callable[[str], None]] = None) -> Dict:
+        """Accumulate streamed text deltas into a Messages-style response dict"""
+        chunks = []
+        scanner = _JsonObjectScanner()
+        try:
+            for line in response.iter_lines():
+                if not line.startswith(b"data:"):
+                    continue
+
+                event = _json_loads(line[5:])
+                event_type = event.get("type")
+
+                if event_type == "content_block_delta":
+                    text = event.get("delta", {}).get("text", "")
+                    if not text:
+                        continue
+                    chunks.append(text)
+                    if on_token:
+                        on_token(text)
+                    # Stop reading once the top-level JSON object has closed. The rest of
+                    # the generation is abandoned, so the keep-alive connection is dropped
+                    # rather than drained; a fresh one is cheaper than waiting it out
+                    if scanner.feed(text) is not None:
+                        response.close()
+                        break
+                elif event_type == "error":
+                    response.close()
+                    raise Exception(f"Claude stream error: {event.get('error')}")
+                # message_stop is the last event; reading on to EOF returns the
+                # connection to the pool instead of closing it
+        except BaseException:
+            response.close()
+            raise
+
+        return {"content": [{"type": "text", "text": "".join(chunks)}]}
+
+    def _build_analysis_prompt(self, view: _ScanView, repo_context: Dict, available_tools: List[Dict]) -> str:
         """Build the analysis prompt for Claude"""
 
-        context = self._build_analysis_context(scan_results, repo_context)
+        context = self._build_analysis_context(view, repo_context)
 
         tools_list = ""
         if available_tools:
             tools_list = f"\nAvailable tools: {', '.join([tool.get('name', 'unknown') for tool in available_tools])}"
 
-        prompt = f"""You are a senior DevSecOps security analyst. Analyze the following security scan results and provide actionable recommendations.
+        prompt = f"""Analyze the following security scan results.
 
 {context}
-{tools_list}
-
-Please provide your analysis in JSON format with this exact structure:
-{{
-    "executive_summary": "2-3 sentence summary of findings",
-    "critical_issues": [
-        {{
-            "title": "Short descriptive title",
-            "severity": "CRITICAL|HIGH|MEDIUM|LOW",
-            "file": "file path",
-            "line": line_number,
-            "description": "Clear description of the vulnerability",
-            "business_impact": "Business impact explanation",
-            "recommended_fix": "Specific code fix recommendation",
-            "compliance_mapping": ["OWASP", "SOC 2", "etc"]
-        }}
-    ],
-    "recommended_actions": [
-        "Prioritized list of actions to take"
-    ],
-    "tools_to_use": [
-        {{"tool": "tool_name", "priority": 1}}
-    ]
-}}
-
-Focus on:
-1. The most critical security issues (top 3)
-2. Actionable, developer-friendly recommendations
-3. Business impact and compliance implications
-4. Specific code fixes where possible
-
-Respond ONLY with the JSON - no additional text or formatting."""
+{tools_list}"""
 
         return prompt
 
-    def _build_analysis_context(self, scan_results: Dict, repo_context: Dict) -> str:
+    def _build_analysis_context(self, view: _ScanView, repo_context: Dict) -> str:
         """Build context string for analysis"""
-        critical_issues = scan_results.get('by_severity', {}).get('ERROR', [])
-        warnings = scan_results.get('by_severity', {}).get('WARNING', [])
-
         context = f"""
 Repository Information:
 - Name: {repo_context.get('repo_name', 'Unknown')}
@@ -213,16 +924,16 @@ Repository Information:
 - Commit: {repo_context.get('commit_sha', 'N/A')[:8]}
 
 Scan Results Summary:
-- Total Findings: {scan_results.get('total_findings', 0)}
-- Critical (ERROR): {len(critical_issues)}
-- Warnings: {len(warnings)}
-- Info: {len(scan_results.get('by_severity', {}).get('INFO', []))}
+- Total Findings: {view.total_findings}
+- Critical (ERROR): {len(view.errors)}
+- Warnings: {len(view.warnings)}
+- Info: {view.info_count}
 
 Critical Security Issues:
-{json.dumps(critical_issues, indent=2)}
+{view.errors_json}
 
-Top Warnings (first 5):
-{json.dumps(warnings[:5], indent=2)}
+Top Warnings (first {_MAX_PROMPT_WARNINGS}):
+{view.warnings_json}
 """
         return context
 
@@ -237,14 +948,11 @@ Top Warnings (first 5):
 
             # Try to parse as JSON
             try:
-                analysis = json.loads(response_text)
+                analysis = _json_loads(response_text)
             except json.JSONDecodeError:
                 # If not valid JSON, try to extract JSON from the text
-                import re
-                json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-                if json_match:
-                    analysis = json.loads(json_match.group())
-                else:
+                analysis = _loads_embedded_json(response_text)
+                if analysis is None:
                     # Fallback: create structure from text
                     analysis = {
                         "executive_summary": response_text[:200] + "..." if len(response_text) > 200 else response_text,
@@ -253,19 +961,17 @@ Top Warnings (first 5):
                         "tools_to_use": []
                     }
 
-            # Validate structure
-            required_keys = ["executive_summary", "critical_issues", "recommended_actions", "tools_to_use"]
-            for key in required_keys:
-                if key not in analysis:
-                    analysis[key] = [] if key != "executive_summary" else "Analysis completed"
-
             analysis["raw_response"] = response_text
-            return analysis
+            return self._normalize_analysis(analysis)
 
         except Exception as e:
-            print(f"⚠️ Error parsing Claude response: {e}")
+            logger.warning("⚠️ Error parsing Claude response: %s", e)
             return self._fallback_response(response)
 
+    def _normalize_analysis(self, analysis: Dict) -> Dict:
+        """Validate a parsed analysis and fill in any missing keys"""
+        return AnalysisResult.model_validate(analysis).model_dump()
+
     def _fallback_response(self, response: Dict) -> Dict:
         """Create a fallback response structure"""
         return {
@@ -276,26 +982,27 @@ Top Warnings (first 5):
             "raw_response": str(response)
         }
 
-    def _fallback_analysis(self, scan_results: Dict, repo_context: Dict) -> Dict:
+    def _clean_scan_result(self, repo_context: Dict) -> Dict:
+        """Analysis for a scan with no ERROR or WARNING findings; no Claude call needed"""
+        logger.info("✓ No actionable findings - skipping Claude analysis")
+
+        return {
+            "executive_summary": "No security issues detected",
+            "critical_issues": [],
+            "recommended_actions": [],
+            "tools_to_use": [],
+            "raw_response": ""
+        }
+
+    def _fallback_analysis(self, view: _ScanView, repo_context: Dict) -> Dict:
         """Fallback analysis when Claude is unavailable"""
-        print("🔄 Using fallback analysis...")
+        logger.info("🔄 Using fallback analysis...")
 
-        critical_count = len(scan_results.get('by_severity', {}).get('ERROR', []))
-        warning_count = len(scan_results.get('by_severity', {}).get('WARNING', []))
+        critical_count = len(view.errors)
+        warning_count = len(view.warnings)
 
         # Create basic analysis from scan results
-        critical_issues = []
-        for issue in scan_results.get('by_severity', {}).get('ERROR', [])[:3]:
-            critical_issues.append({
-                "title": issue.get('rule_id', 'Security Issue'),
-                "severity": "CRITICAL",
-                "file": issue.get('file', 'unknown'),
-                "line": issue.get('line', 0),
-                "description": issue.get('message', 'Security vulnerability detected'),
-                "business_impact": "Potential security risk requiring immediate attention",
-                "recommended_fix": "Review and remediate the identified security issue according to best practices",
-                "compliance_mapping": ["OWASP", "SOC 2"]
-            })
+        critical_issues = self._critical_issues_from_scan(view)
 
         return {
             "executive_summary": f"Automated fallback analysis: Found {critical_count} critical issues and {warning_count} warnings requiring attention.",
@@ -312,6 +1019,22 @@ Top Warnings (first 5):
             ]
         }
 
+    def _critical_issues_from_scan(self, view: _ScanView) -> List[Dict]:
+        """Convert the top scanner ERROR findings into analysis-style issues"""
+        critical_issues = []
+        for issue in view.errors[:3]:
+            critical_issues.append({
+                "title": issue.get('rule_id', 'Security Issue'),
+                "severity": "CRITICAL",
+                "file": issue.get('file', 'unknown'),
+                "line": issue.get('line', 0),
+                "description": issue.get('message', 'Security vulnerability detected'),
+                "business_impact": "Potential security risk requiring immediate attention",
+                "recommended_fix": "Review and remediate the identified security issue according to best practices",
+                "compliance_mapping": ["OWASP", "SOC 2"]
+            })
+        return critical_issues
+
     def _build_code_fix_prompt(self, security_issues: List[Dict], repo_context: Dict) -> str:
         """Build prompt for generating code fixes"""
 
@@ -326,53 +1049,11 @@ Issue #{i}:
 - Current Code Problem: {issue.get('recommended_fix', 'See description')}
 """
 
-        prompt = f"""You are an expert software security engineer. Generate specific code fixes for the following security vulnerabilities.
-
-Repository: {repo_context.get('repo_name', 'Unknown')}
+        prompt = f"""Repository: {repo_context.get('repo_name', 'Unknown')}
 Branch: {repo_context.get('branch', 'main')}
 
 Security Issues to Fix:
-{issues_context}
-
-For each vulnerability, provide the exact code changes needed. Return your response in this JSON format:
-
-{{
-    "summary": "Brief summary of fixes applied",
-    "file_changes": [
-        {{
-            "file_path": "path/to/file.py",
-            "issue_type": "sql-injection|xss|hardcoded-secrets|etc",
-            "description": "What this fix addresses",
-            "changes": [
-                {{
-                    "line_start": 10,
-                    "line_end": 15,
-                    "old_code": "exact old code here",
-                    "new_code": "exact new secure code here",
-                    "explanation": "why this fix works"
-                }}
-            ]
-        }}
-    ],
-    "additional_files": [
-        {{
-            "file_path": "new/security/config.py",
-            "content": "complete file content if new file needed",
-            "purpose": "what this new file does"
-        }}
-    ],
-    "commit_message": "security: fix vulnerabilities in authentication and input validation"
-}}
-
-Requirements:
-1. Provide EXACT code replacements - include proper indentation
-2. Focus on the most critical security issues first
-3. Ensure fixes don't break existing functionality
-4. Add security best practices (input validation, sanitization, etc.)
-5. Include proper error handling where needed
-6. Use secure coding patterns for the detected language
-
-Respond ONLY with valid JSON - no additional text."""
+{issues_context}"""
 
         return prompt
 
@@ -387,31 +1068,18 @@ Respond ONLY with valid JSON - no additional text."""
 
             # Parse JSON
             try:
-                fixes = json.loads(response_text)
+                fixes = _json_loads(response_text)
             except json.JSONDecodeError:
                 # Try to extract JSON from text
-                import re
-                json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-                if json_match:
-                    fixes = json.loads(json_match.group())
-                else:
+                fixes = _loads_embedded_json(response_text)
+                if fixes is None:
                     raise ValueError("Could not extract JSON from response")
 
-            # Validate structure
-            if "file_changes" not in fixes:
-                fixes["file_changes"] = []
-            if "additional_files" not in fixes:
-                fixes["additional_files"] = []
-            if "summary" not in fixes:
-                fixes["summary"] = "Code fixes generated"
-            if "commit_message" not in fixes:
-                fixes["commit_message"] = "security: fix vulnerabilities"
-
             fixes["raw_response"] = response_text
-            return fixes
+            return CodeFixResult.model_validate(fixes).model_dump()
 
         except Exception as e:
-            print(f"⚠️ Error parsing code fix response: {e}")
+            logger.warning("⚠️ Error parsing code fix response: %s", e)
             return self._fallback_code_fixes_response(response)
 
     def _fallback_code_fixes_response(self, response: Dict) -> Dict:
@@ -425,9 +1093,19 @@ Respond ONLY with valid JSON - no additional text."""
             "error": "Code fix generation failed"
         }
 
+    def _clean_code_fixes(self) -> Dict:
+        """Code fix result when there are no issues to fix"""
+        return {
+            "summary": "No security issues to fix",
+            "file_changes": [],
+            "additional_files": [],
+            "commit_message": "",
+            "raw_response": ""
+        }
+
     def _fallback_code_fixes(self, security_issues: List[Dict], repo_context: Dict) -> Dict:
         """Fallback when code fix generation fails"""
-        print("🔄 Using fallback code fixes...")
+        logger.info("🔄 Using fallback code fixes...")
 
         return {
             "summary": f"Manual fixes needed for {len(security_issues)} security issues",
@@ -438,10 +1116,93 @@ Respond ONLY with valid JSON - no additional text."""
         }
 
 
+class AnalysisBatcher:
+    """
+    Collects analysis requests from concurrent callers and sends them to
+    Claude together, flushing after max_items requests or max_wait_ms
+    """
+
+    def __init__(self, agent: BedrockAgentCore, max_wait_ms: int = 200, max_items: int = 8):
+        self.agent = agent
+        self.max_wait_ms = max_wait_ms
+        self.max_items = max_items
+        self._pending: List[tuple] = []
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+    def submit(self, scan_results: Dict, repo_context: Dict) -> Future:
+        """Queue a scan for analysis; the returned Future resolves to its analysis"""
+        future = Future()
+        batch = None
+
+        with self._lock:
+            self._pending.append((scan_results, repo_context, future))
+            if len(self._pending) >= self.max_items:
+                batch = self._take_pending()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.max_wait_ms / 1000, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+        if batch:
+            self._run(batch)
+        return future
+
+    def flush(self):
+        """Send everything that is currently queued"""
+        with self._lock:
+            batch = self._take_pending()
+        if batch:
+            self._run(batch)
+
+    def _take_pending(self) -> List[tuple]:
+        """Detach the pending queue; caller must hold the lock"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        return batch
+
+    def _run(self, batch: List[tuple]):
+        """Analyze a batch and resolve each caller's Future"""
+        try:
+            analyses = self.agent.analyze_security_findings_batch(
+                [(scan_results, repo_context) for scan_results, repo_context, _ in batch],
+                max_items=self.max_items
+            )
+            for (_, _, future), analysis in zip(batch, analyses):
+                future.set_result(analysis)
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+
+_AGENT: Optional[BedrockAgentCore] = None
+_AGENT_LOCK = threading.Lock()
+
+
+def get_agent() -> BedrockAgentCore:
+    """
+    Return the process-wide BedrockAgentCore, creating it on first use
+
+    Callers should use this rather than BedrockAgentCore() so the HTTP
+    session, connection pool and response cache are shared.
+    """
+    global _AGENT
+    if _AGENT is None:
+        with _AGENT_LOCK:
+            if _AGENT is None:
+                _AGENT = BedrockAgentCore()
+    return _AGENT
+
+
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
     # Test the Claude API integration
     try:
-        agent = BedrockAgentCore()
+        agent = get_agent()
 
         # Mock scan results for testing
         test_scan = {
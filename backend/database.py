@@ -1,13 +1,256 @@
+import atexit
 import os
 import sqlite3
 import json
-from typing import Dict, List, Any, Optional
+import logging
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Any, Optional
 from datetime import datetime
 from pathlib import Path
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import apsw
+except ImportError:
+    apsw = None
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Per-connection tuning; journal_mode=WAL is persistent and set once at init
+_CONNECTION_PRAGMAS = (
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA cache_size=-64000',
+    'PRAGMA mmap_size=268435456',
+    'PRAGMA busy_timeout=5000',
+    'PRAGMA foreign_keys=ON',
+)
+
+# Rows fetched per round when streaming findings
+_FETCH_BATCH_SIZE = 1024
+
+# Prepared statements kept per connection; SQL text lives in module constants below
+_CACHED_STATEMENTS = 256
+
+# SQLite 3.45+ can store JSON as pre-parsed JSONB blobs; older builds keep TEXT.
+# Column affinity leaves both blobs and text untouched, so no schema change is needed.
+_HAS_JSONB = sqlite3.sqlite_version_info >= (3, 45, 0)
+_JSON_PARAM = 'jsonb(?)' if _HAS_JSONB else '?'
+
+# apsw is only used when its bundled SQLite is at least as new as the sqlite3 module's,
+# so it understands every SQL function the statements below may use
+_USE_APSW = apsw is not None and tuple(
+    int(part) for part in apsw.sqlite_lib_version().split('.')[:3]
+) >= sqlite3.sqlite_version_info
+
+# INSERT ... RETURNING (3.35+) hands back the new id from the same statement
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+
+def _json_loads(data: Optional[str]) -> Any:
+    """Parse a stored JSON column, treating NULL/empty as an empty list"""
+    if not data:
+        return []
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_column(name: str) -> str:
+    """Select expression that returns a JSON column as text"""
+    return f'json({name}) AS {name}' if _HAS_JSONB else name
+
+
+_SQL_INSERT_SCAN_RUN = '''
+    INSERT INTO scan_runs (repo_name, branch, commit_sha, scan_status)
+    VALUES (?, ?, ?, 'running')
+''' + (' RETURNING id' if _HAS_RETURNING else '')
+
+# Statuses after which a scan run is final and gets its completed_at stamp
+_TERMINAL_STATUSES = frozenset(['completed', 'failed', 'timeout'])
+
+_SQL_UPDATE_SCAN_RUN_TEMPLATE = '''
+    UPDATE scan_runs
+    SET scan_status = ?,
+        total_findings = ?,
+        {counts},
+        scan_duration_seconds = ?{completed}
+    WHERE id = ?
+'''
+
+# Severity counts passed in by the caller
+_COUNTS_FROM_PARAMS = '''critical_count = ?,
+        high_count = ?,
+        medium_count = ?,
+        low_count = ?'''
+
+# Severity counts aggregated from the stored findings in one pass over the scan's rows
+_COUNTS_FROM_FINDINGS = '''(critical_count, high_count, medium_count, low_count) = (
+            SELECT COALESCE(SUM(severity = 'ERROR'), 0),
+                   COALESCE(SUM(severity = 'WARNING'), 0),
+                   COALESCE(SUM(severity = 'MEDIUM'), 0),
+                   COALESCE(SUM(severity = 'LOW'), 0)
+            FROM security_findings
+            WHERE scan_run_id = ?
+        )'''
+
+_COMPLETED_AT = ''',
+        completed_at = CURRENT_TIMESTAMP'''
+
+_SQL_UPDATE_SCAN_RUN = _SQL_UPDATE_SCAN_RUN_TEMPLATE.format(counts=_COUNTS_FROM_PARAMS, completed='')
+_SQL_COMPLETE_SCAN_RUN = _SQL_UPDATE_SCAN_RUN_TEMPLATE.format(counts=_COUNTS_FROM_PARAMS, completed=_COMPLETED_AT)
+_SQL_UPDATE_SCAN_RUN_COUNTED = _SQL_UPDATE_SCAN_RUN_TEMPLATE.format(counts=_COUNTS_FROM_FINDINGS, completed='')
+_SQL_COMPLETE_SCAN_RUN_COUNTED = _SQL_UPDATE_SCAN_RUN_TEMPLATE.format(
+    counts=_COUNTS_FROM_FINDINGS, completed=_COMPLETED_AT
+)
+
+_SQL_INSERT_FINDING = f'''
+    INSERT INTO security_findings (
+        scan_run_id, rule_id, severity, file_path, line_number,
+        message, code_snippet, cwe_ids, owasp_categories
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, {_JSON_PARAM}, {_JSON_PARAM})
+'''
+
+_SQL_SELECT_FINDINGS = f'''
+    SELECT id, scan_run_id, rule_id, severity, file_path, line_number,
+           message, code_snippet, {_json_column('cwe_ids')},
+           {_json_column('owasp_categories')}, status, created_at
+    FROM security_findings
+    WHERE scan_run_id = ?
+    ORDER BY severity, file_path, line_number
+'''
+
+# Row type for _SQL_SELECT_FINDINGS; use ._asdict() where a dict is needed
+Finding = namedtuple('Finding', [
+    'id', 'scan_run_id', 'rule_id', 'severity', 'file_path', 'line_number',
+    'message', 'code_snippet', 'cwe_ids', 'owasp_categories', 'status', 'created_at'
+])
+
+_SQL_INSERT_ANALYSIS = f'''
+    INSERT INTO ai_analysis (
+        scan_run_id, executive_summary, critical_issues,
+        recommended_actions, tools_to_use, raw_response
+    ) VALUES (?, ?, {_JSON_PARAM}, {_JSON_PARAM}, {_JSON_PARAM}, ?)
+'''
+
+_SQL_SELECT_ANALYSIS = f'''
+    SELECT id, scan_run_id, executive_summary, {_json_column('critical_issues')},
+           {_json_column('recommended_actions')}, {_json_column('tools_to_use')},
+           raw_response, analysis_timestamp
+    FROM ai_analysis
+    WHERE scan_run_id = ?
+'''
+
+_SQL_INSERT_GITHUB_ISSUE = '''
+    INSERT INTO github_issues (
+        scan_run_id, issue_number, issue_url, title
+    ) VALUES (?, ?, ?, ?)
+'''
+
+_SQL_INSERT_VANTA_LOG = f'''
+    INSERT INTO vanta_logs (scan_run_id, log_type, log_data)
+    VALUES (?, ?, {_JSON_PARAM})
+'''
+
+# updated_at is derived rather than rewritten on every status change
+_SCAN_RUN_COLUMNS = '''
+    id, repo_name, branch, commit_sha, scan_timestamp, scan_status,
+    total_findings, critical_count, high_count, medium_count, low_count,
+    scan_duration_seconds, created_at, completed_at,
+    COALESCE(completed_at, created_at) AS updated_at
+'''
+
+_SQL_SELECT_SCAN_RUN = f'SELECT {_SCAN_RUN_COLUMNS} FROM scan_runs WHERE id = ?'
+
+_SQL_SELECT_RECENT_SCANS = f'''
+    SELECT {_SCAN_RUN_COLUMNS} FROM scan_runs
+    ORDER BY scan_timestamp DESC
+    LIMIT ?
+'''
+
+_SQL_SELECT_RECENT_SCANS_FOR_REPO = f'''
+    SELECT {_SCAN_RUN_COLUMNS} FROM scan_runs
+    WHERE repo_name = ?
+    ORDER BY scan_timestamp DESC
+    LIMIT ?
+'''
+
+
+# Column definitions for each table, used both to create tables and to rebuild them
+_TABLE_COLUMNS = {
+    'scan_runs': '''
+        id INTEGER PRIMARY KEY,
+        repo_name TEXT NOT NULL,
+        branch TEXT NOT NULL,
+        commit_sha TEXT NOT NULL,
+        scan_timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+        scan_status TEXT NOT NULL DEFAULT 'pending',
+        total_findings INTEGER DEFAULT 0,
+        critical_count INTEGER DEFAULT 0,
+        high_count INTEGER DEFAULT 0,
+        medium_count INTEGER DEFAULT 0,
+        low_count INTEGER DEFAULT 0,
+        scan_duration_seconds REAL,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        completed_at DATETIME
+    ''',
+    'security_findings': '''
+        id INTEGER PRIMARY KEY,
+        scan_run_id INTEGER NOT NULL,
+        rule_id TEXT NOT NULL,
+        severity TEXT NOT NULL,
+        file_path TEXT NOT NULL,
+        line_number INTEGER,
+        message TEXT NOT NULL,
+        code_snippet TEXT,
+        cwe_ids TEXT,
+        owasp_categories TEXT,
+        status TEXT DEFAULT 'open',
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (scan_run_id) REFERENCES scan_runs (id) ON DELETE CASCADE
+    ''',
+    'ai_analysis': '''
+        id INTEGER PRIMARY KEY,
+        scan_run_id INTEGER NOT NULL,
+        executive_summary TEXT,
+        critical_issues TEXT,
+        recommended_actions TEXT,
+        tools_to_use TEXT,
+        raw_response TEXT,
+        analysis_timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (scan_run_id) REFERENCES scan_runs (id) ON DELETE CASCADE
+    ''',
+    'github_issues': '''
+        id INTEGER PRIMARY KEY,
+        scan_run_id INTEGER NOT NULL,
+        issue_number INTEGER NOT NULL,
+        issue_url TEXT NOT NULL,
+        title TEXT NOT NULL,
+        status TEXT DEFAULT 'open',
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        closed_at DATETIME,
+        FOREIGN KEY (scan_run_id) REFERENCES scan_runs (id) ON DELETE CASCADE
+    ''',
+    'vanta_logs': '''
+        id INTEGER PRIMARY KEY,
+        scan_run_id INTEGER NOT NULL,
+        log_type TEXT NOT NULL,
+        log_data TEXT NOT NULL,
+        status TEXT DEFAULT 'pending',
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (scan_run_id) REFERENCES scan_runs (id) ON DELETE CASCADE
+    ''',
+}
+
 
 class DatabaseHandler:
     """
@@ -22,103 +265,187 @@ class DatabaseHandler:
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
-        print(f"✓ Database initialized: {self.db_path}")
+        # One long-lived connection per thread keeps SQLite's page cache warm
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        atexit.register(self.close)
+
+        logger.debug("✓ Database initialized: %s", self.db_path)
         self._initialize_database()
 
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._open()
+        return conn
+
+    def _open(self) -> sqlite3.Connection:
+        """Open a connection with the performance PRAGMAs applied"""
+        # check_same_thread=False only so close() can run from the atexit thread
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            cached_statements=_CACHED_STATEMENTS
+        )
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+
+        self._local.conn = conn
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+
+    def _connect_apsw(self) -> 'apsw.Connection':
+        """Return this thread's apsw connection for bulk writes, opening it on first use"""
+        conn = getattr(self._local, 'apsw_conn', None)
+        if conn is None:
+            conn = apsw.Connection(str(self.db_path))
+            cursor = conn.cursor()
+            for pragma in _CONNECTION_PRAGMAS:
+                cursor.execute(pragma)
+
+            self._local.apsw_conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def _transaction(self, conn: Optional[sqlite3.Connection] = None):
+        """Yield a connection, committing only when the caller didn't pass one in"""
+        if conn is not None:
+            yield conn
+            return
+
+        conn = self._connect()
+        with conn:
+            yield conn
+
+    def close(self):
+        """Close every connection opened by this handler"""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        self._local = threading.local()
+
     def _initialize_database(self):
         """Create database tables if they don't exist"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS scan_runs (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    repo_name TEXT NOT NULL,
-                    branch TEXT NOT NULL,
-                    commit_sha TEXT NOT NULL,
-                    scan_timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    scan_status TEXT NOT NULL DEFAULT 'pending',
-                    total_findings INTEGER DEFAULT 0,
-                    critical_count INTEGER DEFAULT 0,
-                    high_count INTEGER DEFAULT 0,
-                    medium_count INTEGER DEFAULT 0,
-                    low_count INTEGER DEFAULT 0,
-                    scan_duration_seconds REAL,
-                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
+        with self._connect() as conn:
+            # WAL lets readers proceed during writes and cuts fsyncs per commit
+            conn.execute('PRAGMA journal_mode=WAL')
 
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS security_findings (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    scan_run_id INTEGER NOT NULL,
-                    rule_id TEXT NOT NULL,
-                    severity TEXT NOT NULL,
-                    file_path TEXT NOT NULL,
-                    line_number INTEGER,
-                    message TEXT NOT NULL,
-                    code_snippet TEXT,
-                    cwe_ids TEXT,
-                    owasp_categories TEXT,
-                    status TEXT DEFAULT 'open',
-                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (scan_run_id) REFERENCES scan_runs (id)
-                )
-            ''')
+            for table, columns in _TABLE_COLUMNS.items():
+                conn.execute(f'CREATE TABLE IF NOT EXISTS {table} ({columns})')
 
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS ai_analysis (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    scan_run_id INTEGER NOT NULL,
-                    executive_summary TEXT,
-                    critical_issues TEXT,
-                    recommended_actions TEXT,
-                    tools_to_use TEXT,
-                    raw_response TEXT,
-                    analysis_timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (scan_run_id) REFERENCES scan_runs (id)
-                )
-            ''')
+            self._migrate_tables(conn)
 
+            # Create indexes for better performance
+            # Serves get_recent_scans(repo_name) filter and ORDER BY from one index range scan
+            conn.execute('DROP INDEX IF EXISTS idx_scan_runs_repo')
             conn.execute('''
-                CREATE TABLE IF NOT EXISTS github_issues (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    scan_run_id INTEGER NOT NULL,
-                    issue_number INTEGER NOT NULL,
-                    issue_url TEXT NOT NULL,
-                    title TEXT NOT NULL,
-                    status TEXT DEFAULT 'open',
-                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    closed_at DATETIME,
-                    FOREIGN KEY (scan_run_id) REFERENCES scan_runs (id)
-                )
+                CREATE INDEX IF NOT EXISTS idx_scan_runs_repo_time
+                ON scan_runs(repo_name, scan_timestamp DESC)
             ''')
+            # Still used by the unfiltered recent-scans listing and cleanup_old_scans
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_scan_runs_timestamp ON scan_runs(scan_timestamp)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_findings_severity ON security_findings(severity)')
 
+            # Matches get_scan_findings' filter and ORDER BY, so no temp sort is needed
+            conn.execute('DROP INDEX IF EXISTS idx_findings_scan_run')
             conn.execute('''
-                CREATE TABLE IF NOT EXISTS vanta_logs (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    scan_run_id INTEGER NOT NULL,
-                    log_type TEXT NOT NULL,
-                    log_data TEXT NOT NULL,
-                    status TEXT DEFAULT 'pending',
-                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (scan_run_id) REFERENCES scan_runs (id)
-                )
+                CREATE INDEX IF NOT EXISTS idx_findings_scan_sort
+                ON security_findings(scan_run_id, severity, file_path, line_number)
             ''')
 
-            # Create indexes for better performance
-            conn.execute('CREATE INDEX IF NOT EXISTS idx_scan_runs_repo ON scan_runs(repo_name)')
-            conn.execute('CREATE INDEX IF NOT EXISTS idx_scan_runs_timestamp ON scan_runs(scan_timestamp)')
-            conn.execute('CREATE INDEX IF NOT EXISTS idx_findings_scan_run ON security_findings(scan_run_id)')
-            conn.execute('CREATE INDEX IF NOT EXISTS idx_findings_severity ON security_findings(severity)')
+            # Foreign key columns on the child tables
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_analysis_scan ON ai_analysis(scan_run_id)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_issues_scan ON github_issues(scan_run_id)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_vanta_scan ON vanta_logs(scan_run_id)')
 
             conn.commit()
-            print("✓ Database tables initialized")
+
+            # Seed planner statistics the first time; PRAGMA optimize keeps them fresh afterwards
+            has_stats = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+            ).fetchone()
+            if not has_stats:
+                conn.execute('ANALYZE')
+
+            logger.debug("✓ Database tables initialized")
+
+    def _migrate_tables(self, conn: sqlite3.Connection):
+        """Rebuild tables created by older versions of the schema"""
+        rows = conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'table' AND name IN (%s)"
+            % ','.join('?' * len(_TABLE_COLUMNS)),
+            tuple(_TABLE_COLUMNS)
+        ).fetchall()
+
+        for table, sql in rows:
+            sql = sql.upper()
+            # AUTOINCREMENT makes every insert also write sqlite_sequence;
+            # child rows must cascade so cleanup is a single DELETE
+            if 'AUTOINCREMENT' in sql or ('REFERENCES' in sql and 'ON DELETE CASCADE' not in sql):
+                self._rebuild_table(conn, table)
+
+        scan_run_columns = {row[1] for row in conn.execute('PRAGMA table_info(scan_runs)')}
+        if 'completed_at' not in scan_run_columns:
+            conn.execute('ALTER TABLE scan_runs ADD COLUMN completed_at DATETIME')
+            if 'updated_at' in scan_run_columns:
+                # The old last-update stamp is the completion time of finished runs
+                conn.execute(
+                    'UPDATE scan_runs SET completed_at = updated_at '
+                    'WHERE completed_at IS NULL AND scan_status IN (%s)'
+                    % ','.join('?' * len(_TERMINAL_STATUSES)),
+                    tuple(_TERMINAL_STATUSES)
+                )
+
+    def _rebuild_table(self, conn: sqlite3.Connection, table: str):
+        """Recreate a table from _TABLE_COLUMNS, copying its rows, in one transaction"""
+        new_table = f'{table}_new'
+        old_columns = {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+        # Dropping the old table must not cascade; foreign_keys can't change inside a transaction
+        conn.execute('PRAGMA foreign_keys=OFF')
+        conn.execute('BEGIN')
+        try:
+            conn.execute(f'DROP TABLE IF EXISTS {new_table}')
+            conn.execute(f'CREATE TABLE {new_table} ({_TABLE_COLUMNS[table]})')
+            new_columns = [row[1] for row in conn.execute(f'PRAGMA table_info({new_table})')]
+            copied = [c for c in new_columns if c in old_columns]
+            selected = list(copied)
+            if table == 'scan_runs' and 'updated_at' in old_columns:
+                # Older schemas kept only updated_at; it is the completion time of finished runs
+                statuses = ', '.join(f"'{status}'" for status in sorted(_TERMINAL_STATUSES))
+                backfill = f'CASE WHEN scan_status IN ({statuses}) THEN updated_at END'
+                if 'completed_at' in copied:
+                    selected[copied.index('completed_at')] = f'COALESCE(completed_at, {backfill})'
+                else:
+                    copied.append('completed_at')
+                    selected.append(backfill)
+            conn.execute(
+                f'INSERT INTO {new_table} ({", ".join(copied)}) SELECT {", ".join(selected)} FROM {table}'
+            )
+            conn.execute(f'DROP TABLE {table}')
+            conn.execute(f'ALTER TABLE {new_table} RENAME TO {table}')
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        finally:
+            conn.execute('PRAGMA foreign_keys=ON')
+        logger.info("✓ Migrated table schema: %s", table)
 
     def create_scan_run(
         self,
         repo_name: str,
         branch: str,
-        commit_sha: str
+        commit_sha: str,
+        conn: Optional[sqlite3.Connection] = None
     ) -> int:
         """
         Create a new scan run record
@@ -127,21 +454,18 @@ class DatabaseHandler:
             repo_name: Repository name
             branch: Git branch name
             commit_sha: Git commit SHA
+            conn: Connection with an open transaction to write into (optional)
 
         Returns:
             Scan run ID
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._transaction(conn) as conn:
             cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO scan_runs (repo_name, branch, commit_sha, scan_status)
-                VALUES (?, ?, ?, 'running')
-            ''', (repo_name, branch, commit_sha))
+            cursor.execute(_SQL_INSERT_SCAN_RUN, (repo_name, branch, commit_sha))
 
-            scan_run_id = cursor.lastrowid
-            conn.commit()
+            scan_run_id = cursor.fetchone()[0] if _HAS_RETURNING else cursor.lastrowid
 
-            print(f"✓ Created scan run #{scan_run_id} for {repo_name}")
+            logger.debug("✓ Created scan run #%s for %s", scan_run_id, repo_name)
             return scan_run_id
 
     def update_scan_run(
@@ -150,7 +474,8 @@ class DatabaseHandler:
         status: str,
         total_findings: int = 0,
         finding_counts: Dict[str, int] = None,
-        duration: float = None
+        duration: float = None,
+        conn: Optional[sqlite3.Connection] = None
     ):
         """
         Update scan run with results
@@ -159,26 +484,18 @@ class DatabaseHandler:
             scan_run_id: Scan run ID
             status: Scan status (completed, failed, etc.)
             total_findings: Total number of findings
-            finding_counts: Dict with counts by severity
+            finding_counts: Dict with counts by severity; when None the counts are
+                computed from the findings already stored for this scan run
             duration: Scan duration in seconds
+            conn: Connection with an open transaction to write into (optional)
         """
+        terminal = status in _TERMINAL_STATUSES
         if finding_counts is None:
-            finding_counts = {}
-
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute('''
-                UPDATE scan_runs
-                SET scan_status = ?,
-                    total_findings = ?,
-                    critical_count = ?,
-                    high_count = ?,
-                    medium_count = ?,
-                    low_count = ?,
-                    scan_duration_seconds = ?,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-            ''', (
+            sql = _SQL_COMPLETE_SCAN_RUN_COUNTED if terminal else _SQL_UPDATE_SCAN_RUN_COUNTED
+            params = (status, total_findings, scan_run_id, duration, scan_run_id)
+        else:
+            sql = _SQL_COMPLETE_SCAN_RUN if terminal else _SQL_UPDATE_SCAN_RUN
+            params = (
                 status,
                 total_findings,
                 finding_counts.get('ERROR', 0),
@@ -187,15 +504,23 @@ class DatabaseHandler:
                 finding_counts.get('LOW', 0),
                 duration,
                 scan_run_id
-            ))
+            )
 
-            conn.commit()
-            print(f"✓ Updated scan run #{scan_run_id} - Status: {status}")
+        owns_transaction = conn is None
+        with self._transaction(conn) as conn:
+            conn.execute(sql, params)
+
+            logger.debug("✓ Updated scan run #%s - Status: %s", scan_run_id, status)
+
+        # A finished scan has just added its findings; refresh stale planner stats
+        if owns_transaction and status in ('completed', 'failed'):
+            self._connect().execute('PRAGMA optimize')
 
     def store_security_findings(
         self,
         scan_run_id: int,
-        findings: List[Dict]
+        findings: List[Dict],
+        conn: Optional[sqlite3.Connection] = None
     ):
         """
         Store security findings from Semgrep scan
@@ -203,35 +528,43 @@ class DatabaseHandler:
         Args:
             scan_run_id: Scan run ID
             findings: List of finding dictionaries
+            conn: Connection with an open transaction to write into (optional)
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
+        rows = (
+            (
+                scan_run_id,
+                finding.get('rule_id', 'unknown'),
+                finding.get('severity', 'INFO'),
+                finding.get('file', 'unknown'),
+                finding.get('line', 0),
+                finding.get('message', ''),
+                finding.get('code_snippet', ''),
+                json.dumps(finding.get('cwe', [])),
+                json.dumps(finding.get('owasp', []))
+            )
+            for finding in findings
+        )
+
+        if conn is None and _USE_APSW:
+            # apsw binds parameters with less per-row overhead than sqlite3
+            apsw_conn = self._connect_apsw()
+            with apsw_conn:
+                apsw_conn.cursor().executemany(_SQL_INSERT_FINDING, rows)
+            logger.debug("✓ Stored %d security findings", len(findings))
+            return
 
-            for finding in findings:
-                cursor.execute('''
-                    INSERT INTO security_findings (
-                        scan_run_id, rule_id, severity, file_path, line_number,
-                        message, code_snippet, cwe_ids, owasp_categories
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    scan_run_id,
-                    finding.get('rule_id', 'unknown'),
-                    finding.get('severity', 'INFO'),
-                    finding.get('file', 'unknown'),
-                    finding.get('line', 0),
-                    finding.get('message', ''),
-                    finding.get('code_snippet', ''),
-                    json.dumps(finding.get('cwe', [])),
-                    json.dumps(finding.get('owasp', []))
-                ))
-
-            conn.commit()
-            print(f"✓ Stored {len(findings)} security findings")
+        with self._transaction(conn) as conn:
+            # One explicit transaction for the whole batch
+            if not conn.in_transaction:
+                conn.execute('BEGIN')
+            conn.executemany(_SQL_INSERT_FINDING, rows)
+            logger.debug("✓ Stored %d security findings", len(findings))
 
     def store_ai_analysis(
         self,
         scan_run_id: int,
-        analysis_results: Dict
+        analysis_results: Dict,
+        conn: Optional[sqlite3.Connection] = None
     ):
         """
         Store AI analysis results
@@ -239,15 +572,11 @@ class DatabaseHandler:
         Args:
             scan_run_id: Scan run ID
             analysis_results: Analysis results from Claude/OpenAI
+            conn: Connection with an open transaction to write into (optional)
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._transaction(conn) as conn:
             cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO ai_analysis (
-                    scan_run_id, executive_summary, critical_issues,
-                    recommended_actions, tools_to_use, raw_response
-                ) VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
+            cursor.execute(_SQL_INSERT_ANALYSIS, (
                 scan_run_id,
                 analysis_results.get('executive_summary', ''),
                 json.dumps(analysis_results.get('critical_issues', [])),
@@ -256,8 +585,7 @@ class DatabaseHandler:
                 analysis_results.get('raw_response', '')
             ))
 
-            conn.commit()
-            print(f"✓ Stored AI analysis for scan run #{scan_run_id}")
+            logger.debug("✓ Stored AI analysis for scan run #%s", scan_run_id)
 
     def store_github_issue(
         self,
@@ -274,13 +602,9 @@ class DatabaseHandler:
         if not issue_data.get('success'):
             return
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO github_issues (
-                    scan_run_id, issue_number, issue_url, title
-                ) VALUES (?, ?, ?, ?)
-            ''', (
+            cursor.execute(_SQL_INSERT_GITHUB_ISSUE, (
                 scan_run_id,
                 issue_data.get('issue_number'),
                 issue_data.get('issue_url'),
@@ -288,7 +612,7 @@ class DatabaseHandler:
             ))
 
             conn.commit()
-            print(f"✓ Stored GitHub issue #{issue_data.get('issue_number')}")
+            logger.debug("✓ Stored GitHub issue #%s", issue_data.get('issue_number'))
 
     def store_vanta_log(
         self,
@@ -304,23 +628,20 @@ class DatabaseHandler:
             log_type: Type of log (audit, compliance, etc.)
             log_data: Log data dictionary
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO vanta_logs (scan_run_id, log_type, log_data)
-                VALUES (?, ?, ?)
-            ''', (scan_run_id, log_type, json.dumps(log_data)))
+            cursor.execute(_SQL_INSERT_VANTA_LOG, (scan_run_id, log_type, json.dumps(log_data)))
 
             conn.commit()
-            print(f"✓ Stored Vanta log: {log_type}")
+            logger.debug("✓ Stored Vanta log: %s", log_type)
 
     def get_scan_run(self, scan_run_id: int) -> Optional[Dict]:
         """Get scan run details by ID"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._connect() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row
 
-            cursor.execute('SELECT * FROM scan_runs WHERE id = ?', (scan_run_id,))
+            cursor.execute(_SQL_SELECT_SCAN_RUN, (scan_run_id,))
             row = cursor.fetchone()
 
             if row:
@@ -329,139 +650,116 @@ class DatabaseHandler:
 
     def get_recent_scans(self, repo_name: str = None, limit: int = 10) -> List[Dict]:
         """Get recent scan runs"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._connect() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row
 
             if repo_name:
-                cursor.execute('''
-                    SELECT * FROM scan_runs
-                    WHERE repo_name = ?
-                    ORDER BY scan_timestamp DESC
-                    LIMIT ?
-                ''', (repo_name, limit))
+                cursor.execute(_SQL_SELECT_RECENT_SCANS_FOR_REPO, (repo_name, limit))
             else:
-                cursor.execute('''
-                    SELECT * FROM scan_runs
-                    ORDER BY scan_timestamp DESC
-                    LIMIT ?
-                ''', (limit,))
+                cursor.execute(_SQL_SELECT_RECENT_SCANS, (limit,))
 
             return [dict(row) for row in cursor.fetchall()]
 
-    def get_scan_findings(self, scan_run_id: int) -> List[Dict]:
+    def get_scan_findings(self, scan_run_id: int) -> List[Finding]:
         """Get all findings for a scan run"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-
-            cursor.execute('''
-                SELECT * FROM security_findings
-                WHERE scan_run_id = ?
-                ORDER BY severity, file_path, line_number
-            ''', (scan_run_id,))
-
-            findings = []
-            for row in cursor.fetchall():
-                finding = dict(row)
-                # Parse JSON fields
-                finding['cwe_ids'] = json.loads(finding['cwe_ids'] or '[]')
-                finding['owasp_categories'] = json.loads(finding['owasp_categories'] or '[]')
-                findings.append(finding)
-
-            return findings
+        return list(self.iter_scan_findings(scan_run_id))
+
+    def iter_scan_findings(self, scan_run_id: int) -> Iterator[Finding]:
+        """Yield findings for a scan run in batches, keeping memory flat for large scans"""
+        cursor = self._connect().cursor()
+        try:
+            cursor.execute(_SQL_SELECT_FINDINGS, (scan_run_id,))
+
+            while True:
+                batch = cursor.fetchmany(_FETCH_BATCH_SIZE)
+                if not batch:
+                    break
+                # Parse JSON fields (cwe_ids, owasp_categories) while building each tuple
+                for row in batch:
+                    yield Finding._make(row[:8] + (_json_loads(row[8]), _json_loads(row[9])) + row[10:])
+        finally:
+            cursor.close()
 
     def get_ai_analysis(self, scan_run_id: int) -> Optional[Dict]:
         """Get AI analysis for a scan run"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._connect() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = sqlite3.Row
 
-            cursor.execute('SELECT * FROM ai_analysis WHERE scan_run_id = ?', (scan_run_id,))
+            cursor.execute(_SQL_SELECT_ANALYSIS, (scan_run_id,))
             row = cursor.fetchone()
 
             if row:
                 analysis = dict(row)
                 # Parse JSON fields
-                analysis['critical_issues'] = json.loads(analysis['critical_issues'] or '[]')
-                analysis['recommended_actions'] = json.loads(analysis['recommended_actions'] or '[]')
-                analysis['tools_to_use'] = json.loads(analysis['tools_to_use'] or '[]')
+                analysis['critical_issues'] = _json_loads(analysis['critical_issues'])
+                analysis['recommended_actions'] = _json_loads(analysis['recommended_actions'])
+                analysis['tools_to_use'] = _json_loads(analysis['tools_to_use'])
                 return analysis
 
             return None
 
     def get_scan_summary(self) -> Dict:
         """Get overall scan statistics"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
 
-            # Total scans
-            cursor.execute('SELECT COUNT(*) FROM scan_runs')
-            total_scans = cursor.fetchone()[0]
-
-            # Scans by status
-            cursor.execute('SELECT scan_status, COUNT(*) FROM scan_runs GROUP BY scan_status')
-            status_counts = dict(cursor.fetchall())
-
-            # Recent activity (last 7 days)
+            # All statistics in one statement, returned as a single JSON object
             cursor.execute('''
-                SELECT COUNT(*) FROM scan_runs
-                WHERE scan_timestamp >= datetime('now', '-7 days')
+                WITH status AS (
+                    SELECT scan_status, COUNT(*) AS c FROM scan_runs GROUP BY scan_status
+                ),
+                severity AS (
+                    SELECT severity, COUNT(*) AS c FROM security_findings GROUP BY severity
+                )
+                SELECT json_object(
+                    'total_scans', (SELECT COUNT(*) FROM scan_runs),
+                    'status_counts', (SELECT json_group_object(scan_status, c) FROM status),
+                    'recent_scans_7d', (
+                        SELECT COUNT(*) FROM scan_runs
+                        WHERE scan_timestamp >= datetime('now', '-7 days')
+                    ),
+                    'total_findings', (SELECT COUNT(*) FROM security_findings),
+                    'severity_counts', (SELECT json_group_object(severity, c) FROM severity)
+                )
             ''')
-            recent_scans = cursor.fetchone()[0]
-
-            # Total findings
-            cursor.execute('SELECT COUNT(*) FROM security_findings')
-            total_findings = cursor.fetchone()[0]
-
-            # Findings by severity
-            cursor.execute('SELECT severity, COUNT(*) FROM security_findings GROUP BY severity')
-            severity_counts = dict(cursor.fetchall())
-
-            return {
-                'total_scans': total_scans,
-                'status_counts': status_counts,
-                'recent_scans_7d': recent_scans,
-                'total_findings': total_findings,
-                'severity_counts': severity_counts
-            }
+
+            return _json_loads(cursor.fetchone()[0])
 
     def cleanup_old_scans(self, days_old: int = 30):
         """Clean up scan runs older than specified days"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
 
-            # Get old scan run IDs
-            cursor.execute('''
-                SELECT id FROM scan_runs
-                WHERE scan_timestamp < datetime('now', '-{} days')
-            '''.format(days_old))
-
-            old_scan_ids = [row[0] for row in cursor.fetchall()]
-
-            if old_scan_ids:
-                # Delete related records
-                placeholders = ','.join(['?' for _ in old_scan_ids])
-
-                cursor.execute(f'DELETE FROM security_findings WHERE scan_run_id IN ({placeholders})', old_scan_ids)
-                cursor.execute(f'DELETE FROM ai_analysis WHERE scan_run_id IN ({placeholders})', old_scan_ids)
-                cursor.execute(f'DELETE FROM github_issues WHERE scan_run_id IN ({placeholders})', old_scan_ids)
-                cursor.execute(f'DELETE FROM vanta_logs WHERE scan_run_id IN ({placeholders})', old_scan_ids)
-                cursor.execute(f'DELETE FROM scan_runs WHERE id IN ({placeholders})', old_scan_ids)
+            # Findings, analyses, issues and Vanta logs go with their scan run via ON DELETE CASCADE
+            cursor.execute(
+                "DELETE FROM scan_runs WHERE scan_timestamp < datetime('now', ?)",
+                (f'-{int(days_old)} days',)
+            )
+            deleted = cursor.rowcount
 
-                conn.commit()
-                print(f"✓ Cleaned up {len(old_scan_ids)} old scan runs")
+            conn.commit()
+            if deleted:
+                conn.execute('PRAGMA optimize')
+                logger.debug("✓ Cleaned up %s old scan runs", deleted)
             else:
-                print("✓ No old scan runs to clean up")
+                logger.debug("✓ No old scan runs to clean up")
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s")
+
     # Test the database handler
     try:
         db = DatabaseHandler("test_watchman.db")
 
+        # Run all test writes in a single transaction
+        conn = db._connect()
+        conn.execute('BEGIN')
+
         # Test creating a scan run
-        scan_id = db.create_scan_run("test/repo", "main", "abc123")
+        scan_id = db.create_scan_run("test/repo", "main", "abc123", conn=conn)
 
         # Test storing findings
         test_findings = [
@@ -471,13 +769,13 @@ if __name__ == "__main__":
                 "file": "app.py",
                 "line": 45,
                 "message": "SQL injection vulnerability",
-                "code_snippet": "SELECT * FROM users WHERE id = " + user_id,
+                "code_snippet": 'query = "SELECT * FROM users WHERE id = " + user_id',
                 "cwe": ["CWE-89"],
                 "owasp": ["A03:2021"]
             }
         ]
 
-        db.store_security_findings(scan_id, test_findings)
+        db.store_security_findings(scan_id, test_findings, conn=conn)
 
         # Test storing AI analysis
         test_analysis = {
@@ -487,10 +785,12 @@ if __name__ == "__main__":
             "tools_to_use": [{"tool": "Bandit", "priority": 1}]
         }
 
-        db.store_ai_analysis(scan_id, test_analysis)
+        db.store_ai_analysis(scan_id, test_analysis, conn=conn)
 
         # Update scan run
-        db.update_scan_run(scan_id, "completed", 1, {"ERROR": 1}, 5.2)
+        db.update_scan_run(scan_id, "completed", 1, {"ERROR": 1}, 5.2, conn=conn)
+
+        conn.commit()
 
         # Test retrieval
         scan_data = db.get_scan_run(scan_id)
@@ -507,6 +807,7 @@ if __name__ == "__main__":
         print(f"Summary: {summary}")
 
         # Clean up test database
+        db.close()
         os.remove("test_watchman.db")
         print("✓ Database handler test completed successfully")
 
@@ -1,14 +1,417 @@
+import asyncio
+import atexit
+import html
+import logging
 import os
+import queue
+import re
 import smtplib
 import ssl
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from typing import Dict, List, Optional
+import threading
+import time
+from email.message import EmailMessage
+from email.utils import formataddr
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
+from string import Template
+from urllib.parse import quote
 from dotenv import load_dotenv
 
+try:
+    import aiosmtplib
+except ImportError:
+    aiosmtplib = None
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Severity badge colors for the critical-issues table
+_SEVERITY_COLORS = {
+    "CRITICAL": "#dc2626",
+    "HIGH": "#ea580c",
+    "MEDIUM": "#ca8a04",
+    "LOW": "#16a34a"
+}
+_DEFAULT_SEVERITY_COLOR = "#6b7280"
+
+# Scan summary header (color, icon, heading) by outcome
+_SUMMARY_STATUS_CLEAN = ("#16a34a", "✅", "Clean")
+_SUMMARY_STATUS_CRITICAL = ("#dc2626", "🚨", "Critical Issues Found")
+_SUMMARY_STATUS_ISSUES = ("#ea580c", "⚠️", "Issues Found")
+
+_FOOTER_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def _html(value) -> str:
+    """Escape a dynamic value for interpolation into the HTML templates"""
+    return html.escape(str(value))
+
+
+def _href(url) -> str:
+    """Percent-encode a link target and escape it for use in an href attribute"""
+    return html.escape(quote(str(url), safe=":/?#=&%"))
+
+
+def _minify(markup: str) -> str:
+    """
+    Drop indentation from a template (none of them use <pre>). One tag per line keeps
+    lines well under the SMTP 998-octet limit so the body can go out as 8bit.
+    """
+    return re.sub(r"[ \t]{2,}", " ", re.sub(r">\s+<", ">\n<", markup)).strip()
+
+
+# HTML templates, minified and parsed once at import; only the placeholders change per email.
+# The critical-issue row is a str.format template filled with format_map in the per-issue loop.
+_ISSUE_ROW = _minify("""
+            <tr>
+                <td style="padding: 8px; border-bottom: 1px solid #e5e7eb;">
+                    <span style="background: {color}; color: white; padding: 2px 8px; border-radius: 4px; font-size: 12px; font-weight: bold;">
+                        {severity}
+                    </span>
+                </td>
+                <td style="padding: 8px; border-bottom: 1px solid #e5e7eb; font-weight: 500;">{title}</td>
+                <td style="padding: 8px; border-bottom: 1px solid #e5e7eb; color: #6b7280; font-family: monospace; font-size: 13px;">
+                    {file}{line_suffix}
+                </td>
+            </tr>""")
+
+_SECURITY_ISSUE_TMPL = Template(_minify("""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset="UTF-8">
+            <title>Security Alert - $repo_name</title>
+        </head>
+        <body style="font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; line-height: 1.6; color: #374151; margin: 0; padding: 0; background-color: #f9fafb;">
+            <div style="max-width: 600px; margin: 0 auto; padding: 20px; background-color: white; border-radius: 8px; box-shadow: 0 1px 3px rgba(0, 0, 0, 0.1);">
+
+                <!-- Header -->
+                <div style="text-align: center; padding: 20px 0; border-bottom: 2px solid #dc2626;">
+                    <h1 style="color: #dc2626; margin: 0; font-size: 24px;">
+                        🚨 Security Alert
+                    </h1>
+                    <p style="color: #6b7280; margin: 5px 0 0 0;">Watchman Security Scanner</p>
+                </div>
+
+                <!-- Summary -->
+                <div style="padding: 20px 0;">
+                    <h2 style="color: #1f2937; margin: 0 0 10px 0;">Security Vulnerabilities Detected</h2>
+                    <p style="margin: 0 0 15px 0;">
+                        <strong>Repository:</strong> $repo_name<br>
+                        <strong>Branch:</strong> $branch<br>
+                        <strong>Scan Time:</strong> $scan_timestamp
+                    </p>
+                    <p style="background: #fef3c7; padding: 15px; border-radius: 6px; border-left: 4px solid #f59e0b; margin: 15px 0;">
+                        <strong>Executive Summary:</strong><br>
+                        $executive_summary
+                    </p>
+                </div>
+
+                <!-- Critical Issues -->
+                <div style="padding: 20px 0;">
+                    <h3 style="color: #1f2937; margin: 0 0 15px 0;">Critical Security Issues</h3>
+                    <table style="width: 100%; border-collapse: collapse; border: 1px solid #e5e7eb; border-radius: 6px; overflow: hidden;">
+                        <thead>
+                            <tr style="background: #f9fafb;">
+                                <th style="padding: 12px 8px; text-align: left; font-weight: 600; color: #374151; border-bottom: 2px solid #e5e7eb;">Severity</th>
+                                <th style="padding: 12px 8px; text-align: left; font-weight: 600; color: #374151; border-bottom: 2px solid #e5e7eb;">Issue</th>
+                                <th style="padding: 12px 8px; text-align: left; font-weight: 600; color: #374151; border-bottom: 2px solid #e5e7eb;">Location</th>
+                            </tr>
+                        </thead>
+                        <tbody>
+                            $issues_rows
+                        </tbody>
+                    </table>
+                </div>
+
+                <!-- Action Required -->
+                <div style="background: #fef2f2; padding: 20px; border-radius: 6px; border-left: 4px solid #dc2626; margin: 20px 0;">
+                    <h3 style="color: #dc2626; margin: 0 0 10px 0;">⚡ Action Required</h3>
+                    <p style="margin: 0 0 15px 0;">
+                        A GitHub issue has been automatically created to track these security vulnerabilities.
+                        Please review and address these issues promptly to maintain your application's security.
+                    </p>
+                    <a href="$issue_url"
+                       style="display: inline-block; background: #dc2626; color: white; padding: 10px 20px; text-decoration: none; border-radius: 6px; font-weight: 500;">
+                        View GitHub Issue #$issue_number
+                    </a>
+                </div>
+
+                <!-- Footer -->
+                <div style="text-align: center; padding: 20px 0; border-top: 1px solid #e5e7eb; margin-top: 30px; color: #6b7280; font-size: 14px;">
+                    <p style="margin: 0;">
+                        This notification was automatically generated by<br>
+                        <strong>Watchman Security Scanner</strong> 🛡️
+                    </p>
+                    <p style="margin: 10px 0 0 0; font-size: 12px;">
+                        Scan ID: $scan_run_id |
+                        $generated_at
+                    </p>
+                </div>
+            </div>
+        </body>
+        </html>
+        """))
+
+_FILE_ROW_TMPL = Template(_minify("""
+            <li style="padding: 5px 0; font-family: monospace; font-size: 13px; color: #374151;">
+                📄 $file_path
+            </li>"""))
+
+_PR_CREATED_TMPL = Template(_minify("""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset="UTF-8">
+            <title>Automated Security Fix - $repo_name</title>
+        </head>
+        <body style="font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; line-height: 1.6; color: #374151; margin: 0; padding: 0; background-color: #f9fafb;">
+            <div style="max-width: 600px; margin: 0 auto; padding: 20px; background-color: white; border-radius: 8px; box-shadow: 0 1px 3px rgba(0, 0, 0, 0.1);">
+
+                <!-- Header -->
+                <div style="text-align: center; padding: 20px 0; border-bottom: 2px solid #16a34a;">
+                    <h1 style="color: #16a34a; margin: 0; font-size: 24px;">
+                        🔧 Automated Security Fix
+                    </h1>
+                    <p style="color: #6b7280; margin: 5px 0 0 0;">Watchman Security Scanner</p>
+                </div>
+
+                <!-- Summary -->
+                <div style="padding: 20px 0;">
+                    <h2 style="color: #1f2937; margin: 0 0 10px 0;">Security Fix Pull Request Created</h2>
+                    <p style="margin: 0 0 15px 0;">
+                        <strong>Repository:</strong> $repo_name<br>
+                        <strong>Branch:</strong> $branch_name<br>
+                        <strong>Files Modified:</strong> $files_count
+                    </p>
+                    <p style="background: #dcfce7; padding: 15px; border-radius: 6px; border-left: 4px solid #16a34a; margin: 15px 0;">
+                        <strong>Fixes Applied:</strong><br>
+                        $summary
+                    </p>
+                </div>
+
+                <!-- Files Changed -->
+                <div style="padding: 20px 0;">
+                    <h3 style="color: #1f2937; margin: 0 0 15px 0;">Files Modified</h3>
+                    <ul style="list-style: none; padding: 0; margin: 0; background: #f9fafb; border-radius: 6px; padding: 15px;">
+                        $files_rows
+                    </ul>
+                </div>
+
+                <!-- Action Required -->
+                <div style="background: #eff6ff; padding: 20px; border-radius: 6px; border-left: 4px solid #3b82f6; margin: 20px 0;">
+                    <h3 style="color: #3b82f6; margin: 0 0 10px 0;">🔍 Review Required</h3>
+                    <p style="margin: 0 0 15px 0;">
+                        An automated security fix pull request has been created. Please review the changes carefully
+                        and test thoroughly before merging to ensure functionality remains intact.
+                    </p>
+                    <a href="$pr_url"
+                       style="display: inline-block; background: #3b82f6; color: white; padding: 10px 20px; text-decoration: none; border-radius: 6px; font-weight: 500;">
+                        Review Pull Request #$pr_number
+                    </a>
+                </div>
+
+                <!-- Security Note -->
+                <div style="background: #fefce8; padding: 15px; border-radius: 6px; border-left: 4px solid #eab308; margin: 20px 0; font-size: 14px;">
+                    <strong>⚠️ Important:</strong> While these fixes are AI-generated and designed to address security vulnerabilities,
+                    please verify that all functionality works as expected after applying the changes.
+                </div>
+
+                <!-- Footer -->
+                <div style="text-align: center; padding: 20px 0; border-top: 1px solid #e5e7eb; margin-top: 30px; color: #6b7280; font-size: 14px;">
+                    <p style="margin: 0;">
+                        This pull request was automatically generated by<br>
+                        <strong>Watchman Security Scanner</strong> 🛡️
+                    </p>
+                    <p style="margin: 10px 0 0 0; font-size: 12px;">
+                        Scan ID: $scan_run_id |
+                        $generated_at
+                    </p>
+                </div>
+            </div>
+        </body>
+        </html>
+        """))
+
+_SUMMARY_ISSUE_ACTION_TMPL = Template(_minify("""
+            <p style="margin: 5px 0;">
+                📋 <strong>GitHub Issue:</strong>
+                <a href="$issue_url" style="color: #3b82f6; text-decoration: none;">
+                    Issue #$issue_number
+                </a>
+            </p>"""))
+
+_SUMMARY_PR_ACTION_TMPL = Template(_minify("""
+            <p style="margin: 5px 0;">
+                🔧 <strong>Automated Fix PR:</strong>
+                <a href="$pr_url" style="color: #16a34a; text-decoration: none;">
+                    PR #$pr_number
+                </a>
+            </p>"""))
+
+_SUMMARY_NO_ACTIONS = "<p style='margin: 5px 0; color: #6b7280;'>No actions taken (no significant issues found)</p>"
+
+_SUMMARY_NEXT_STEPS_TMPL = Template(_minify("""
+                <div style="background: #fef3c7; padding: 20px; border-radius: 6px; border-left: 4px solid #f59e0b; margin: 20px 0;">
+                    <h3 style="color: #92400e; margin: 0 0 10px 0;">📋 Next Steps</h3>
+                    <ul style="margin: 0; padding-left: 20px;">
+                        <li>Review all security findings in the GitHub issue</li>
+                        $pr_step
+                        <li>Address any remaining security vulnerabilities</li>
+                        <li>Run additional security tests if needed</li>
+                    </ul>
+                </div>
+                """))
+
+_SUMMARY_PR_STEP = "<li>Test and review the automated fix PR before merging</li>"
+
+_SUMMARY_CLEAN = _minify("""
+                <div style="background: #dcfce7; padding: 20px; border-radius: 6px; border-left: 4px solid #16a34a; margin: 20px 0;">
+                    <h3 style="color: #166534; margin: 0 0 10px 0;">🎉 Great Job!</h3>
+                    <p style="margin: 0;">No security vulnerabilities were found in this scan. Your code is looking secure!</p>
+                </div>
+                """)
+
+_SCAN_SUMMARY_TMPL = Template(_minify("""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset="UTF-8">
+            <title>Security Scan Summary - $repo_name</title>
+        </head>
+        <body style="font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; line-height: 1.6; color: #374151; margin: 0; padding: 0; background-color: #f9fafb;">
+            <div style="max-width: 600px; margin: 0 auto; padding: 20px; background-color: white; border-radius: 8px; box-shadow: 0 1px 3px rgba(0, 0, 0, 0.1);">
+
+                <!-- Header -->
+                <div style="text-align: center; padding: 20px 0; border-bottom: 2px solid $status_color;">
+                    <h1 style="color: $status_color; margin: 0; font-size: 24px;">
+                        $status_icon Scan Complete
+                    </h1>
+                    <p style="color: #6b7280; margin: 5px 0 0 0;">Watchman Security Scanner</p>
+                </div>
+
+                <!-- Summary -->
+                <div style="padding: 20px 0;">
+                    <h2 style="color: #1f2937; margin: 0 0 10px 0;">$status_text</h2>
+                    <p style="margin: 0 0 15px 0;">
+                        <strong>Repository:</strong> $repo_name<br>
+                        <strong>Branch:</strong> $branch<br>
+                        <strong>Scan Duration:</strong> $duration seconds<br>
+                        <strong>Completed:</strong> $completed_at
+                    </p>
+                </div>
+
+                <!-- Findings Summary -->
+                <div style="padding: 20px 0;">
+                    <h3 style="color: #1f2937; margin: 0 0 15px 0;">Security Findings</h3>
+                    <div style="display: grid; grid-template-columns: repeat(2, 1fr); gap: 15px;">
+                        <div style="text-align: center; padding: 15px; background: #fef2f2; border-radius: 6px; border: 1px solid #fecaca;">
+                            <div style="font-size: 24px; font-weight: bold; color: #dc2626;">$critical_count</div>
+                            <div style="font-size: 12px; color: #6b7280; text-transform: uppercase; font-weight: 500;">Critical</div>
+                        </div>
+                        <div style="text-align: center; padding: 15px; background: #fef3c7; border-radius: 6px; border: 1px solid #fde68a;">
+                            <div style="font-size: 24px; font-weight: bold; color: #ea580c;">$warnings_count</div>
+                            <div style="font-size: 12px; color: #6b7280; text-transform: uppercase; font-weight: 500;">Warnings</div>
+                        </div>
+                    </div>
+                    <div style="text-align: center; margin-top: 15px; padding: 10px; background: #f9fafb; border-radius: 6px;">
+                        <strong>Total Issues Found: $total_findings</strong>
+                    </div>
+                </div>
+
+                <!-- Actions Taken -->
+                <div style="padding: 20px 0;">
+                    <h3 style="color: #1f2937; margin: 0 0 15px 0;">Actions Taken</h3>
+                    <div style="background: #f9fafb; padding: 15px; border-radius: 6px; border-left: 4px solid #6b7280;">
+                        $actions_html
+                    </div>
+                </div>
+
+                <!-- Next Steps -->
+                $next_steps
+
+                <!-- Footer -->
+                <div style="text-align: center; padding: 20px 0; border-top: 1px solid #e5e7eb; margin-top: 30px; color: #6b7280; font-size: 14px;">
+                    <p style="margin: 0;">
+                        This scan summary was automatically generated by<br>
+                        <strong>Watchman Security Scanner</strong> 🛡️
+                    </p>
+                    <p style="margin: 10px 0 0 0; font-size: 12px;">
+                        Workflow ID: $workflow_id |
+                        Scan ID: $scan_run_id
+                    </p>
+                </div>
+            </div>
+        </body>
+        </html>
+        """))
+
+
+def _render_scan_summary(
+    repo_name: str,
+    total: int,
+    critical: int,
+    warnings: int,
+    duration: float,
+    workflow_id: str,
+    scan_run_id: str,
+    branch: str,
+    completed_at: str,
+    issue_url: Optional[str],
+    issue_number: Optional[int],
+    pr_url: Optional[str],
+    pr_number: Optional[int]
+) -> str:
+    """Render the scan summary email from the precompiled module-level template"""
+
+    # Determine scan status
+    if total == 0:
+        status_color, status_icon, status_text = _SUMMARY_STATUS_CLEAN
+    elif critical > 0:
+        status_color, status_icon, status_text = _SUMMARY_STATUS_CRITICAL
+    else:
+        status_color, status_icon, status_text = _SUMMARY_STATUS_ISSUES
+
+    # Build actions section
+    actions: List[str] = []
+    if issue_url is not None:
+        actions.append(_SUMMARY_ISSUE_ACTION_TMPL.substitute(
+            issue_url=_href(issue_url),
+            issue_number=_html(issue_number)
+        ))
+
+    if pr_url is not None:
+        actions.append(_SUMMARY_PR_ACTION_TMPL.substitute(
+            pr_url=_href(pr_url),
+            pr_number=_html(pr_number)
+        ))
+
+    if total > 0:
+        next_steps = _SUMMARY_NEXT_STEPS_TMPL.substitute(
+            pr_step=_SUMMARY_PR_STEP if pr_url is not None else ""
+        )
+    else:
+        next_steps = _SUMMARY_CLEAN
+
+    ctx = {
+        "repo_name": _html(repo_name),
+        "status_color": status_color,
+        "status_icon": status_icon,
+        "status_text": status_text,
+        "branch": _html(branch),
+        "duration": f"{duration:.1f}",
+        "completed_at": _html(completed_at),
+        "critical_count": _html(critical),
+        "warnings_count": _html(warnings),
+        "total_findings": _html(total),
+        "actions_html": "".join(actions) if actions else _SUMMARY_NO_ACTIONS,
+        "next_steps": next_steps,
+        "workflow_id": _html(workflow_id),
+        "scan_run_id": _html(scan_run_id)
+    }
+    return _SCAN_SUMMARY_TMPL.substitute(ctx)
+
 
 class EmailHandler:
     """
@@ -23,21 +426,45 @@ class EmailHandler:
         self.sender_email = os.getenv('SENDER_EMAIL')
         self.sender_password = os.getenv('SENDER_PASSWORD')  # App password for Gmail
         self.sender_name = os.getenv('SENDER_NAME', 'Watchman Security Scanner')
+        self.smtp_timeout = float(os.getenv('SMTP_TIMEOUT', '30'))
+        self.smtp_max_msgs_per_conn = int(os.getenv('SMTP_MAX_MSGS_PER_CONN', '1000'))
+        self.smtp_idle_ttl = float(os.getenv('SMTP_IDLE_TTL', '90'))
+        self.notify_on_clean = os.getenv('NOTIFY_ON_CLEAN', '0') == '1'
 
         # Notification recipients
         self.default_recipients = self._parse_recipients(os.getenv('NOTIFICATION_RECIPIENTS', ''))
         self.admin_recipients = self._parse_recipients(os.getenv('ADMIN_RECIPIENTS', ''))
+        # Recipients are fixed for the handler's lifetime, so join the To: header once
+        self._default_to_header = ", ".join(self.default_recipients)
+        self._admin_only_recipients = [r for r in self.admin_recipients if r not in self.default_recipients]
 
         # Validate configuration
         if not self.sender_email or not self.sender_password:
             raise ValueError("SENDER_EMAIL and SENDER_PASSWORD must be set in .env file")
 
-        print(f"✓ Email handler initialized - SMTP: {self.smtp_server}:{self.smtp_port}")
-        print(f"✓ Sender: {self.sender_name} <{self.sender_email}>")
-        print(f"✓ Default recipients: {len(self.default_recipients)}")
-
-        # Test connection
-        self._test_connection()
+        # Pooled SMTP session, reused across notifications
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._smtp_msg_count = 0
+        self._smtp_last_used = 0.0
+        self._smtp_lock = threading.Lock()
+        # Deferred messages, sent together over one session by flush()
+        self._outbox: List[Dict] = []
+        # Held only for outbox appends/swaps, never across SMTP I/O
+        self._outbox_lock = threading.Lock()
+
+        # Background worker that owns SMTP delivery so senders never block on I/O
+        self._queue: "queue.Queue[List[Dict]]" = queue.Queue()
+        self._worker_thread = threading.Thread(target=self._worker, name="email-worker", daemon=True)
+        self._worker_thread.start()
+        atexit.register(self.shutdown)
+
+        logger.info("✓ Email handler initialized - SMTP: %s:%s", self.smtp_server, self.smtp_port)
+        logger.info("✓ Sender: %s <%s>", self.sender_name, self.sender_email)
+        logger.info("✓ Default recipients: %s", len(self.default_recipients))
+
+        # Verify credentials up front only when asked; otherwise the first send connects
+        if os.getenv('EMAIL_EAGER_VERIFY') == '1':
+            self._test_connection()
 
     def _parse_recipients(self, recipients_str: str) -> List[str]:
         """Parse comma-separated email addresses"""
@@ -46,16 +473,84 @@ class EmailHandler:
         return [email.strip() for email in recipients_str.split(',') if email.strip()]
 
     def _test_connection(self):
-        """Test SMTP connection"""
+        """Test SMTP connection (the session is kept for the first send)"""
         try:
-            context = ssl.create_default_context()
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls(context=context)
-                server.login(self.sender_email, self.sender_password)
-            print("✓ SMTP connection test successful")
+            with self._smtp_lock:
+                self._get_smtp()
+            logger.info("✓ SMTP connection test successful")
         except Exception as e:
-            print(f"⚠️ SMTP connection test failed: {e}")
-            print("  Make sure your email credentials are correct in .env")
+            logger.warning("⚠️ SMTP connection test failed: %s", e)
+            logger.warning("  Make sure your email credentials are correct in .env")
+
+    def _connect_smtp(self) -> smtplib.SMTP:
+        """Open and authenticate a new SMTP session"""
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port, timeout=self.smtp_timeout)
+        try:
+            server.starttls(context=ssl.create_default_context())
+            server.login(self.sender_email, self.sender_password)
+        except Exception:
+            server.close()
+            raise
+        return server
+
+    def _get_smtp(self) -> smtplib.SMTP:
+        """Return the pooled SMTP session, reconnecting if it went stale. Caller holds _smtp_lock."""
+        # Servers drop idle sessions (often after a few minutes); don't bother probing a stale one
+        if self._smtp is not None and time.monotonic() - self._smtp_last_used > self.smtp_idle_ttl:
+            self._drop_smtp()
+
+        if self._smtp is not None:
+            # RSET doubles as the health check and clears any half-finished transaction
+            try:
+                if self._smtp.rset()[0] == 250:
+                    return self._smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._drop_smtp()
+
+        self._smtp = self._connect_smtp()
+        self._smtp_msg_count = 0
+        self._smtp_last_used = time.monotonic()
+        return self._smtp
+
+    def _drop_smtp(self):
+        """Discard the pooled SMTP session. Caller holds _smtp_lock."""
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except Exception:
+            try:
+                self._smtp.close()
+            except Exception:
+                pass
+        self._smtp = None
+
+    def close(self):
+        """Close the pooled SMTP session"""
+        with self._smtp_lock:
+            self._drop_smtp()
+
+    def shutdown(self):
+        """Hand off deferred emails, wait for the worker to send everything, then disconnect"""
+        self.flush()
+        self._queue.join()
+        self.close()
+
+    def _worker(self):
+        """Drain the send queue, delivering each batch over the pooled session"""
+        while True:
+            jobs = self._queue.get()
+            try:
+                with self._smtp_lock:
+                    results = self._deliver(jobs)
+                for result in results:
+                    if result["success"]:
+                        logger.info("✓ %s email sent to %s recipients", result['email_type'], len(result['recipients']))
+            except Exception as e:
+                logger.error("❌ Email worker error: %s", e)
+            finally:
+                self._queue.task_done()
 
     def send_security_issue_notification(
         self,
@@ -63,7 +558,8 @@ class EmailHandler:
         issue_details: Dict,
         analysis_results: Dict,
         scan_metadata: Dict,
-        recipients: Optional[List[str]] = None
+        recipients: Optional[List[str]] = None,
+        defer: bool = False
     ) -> Dict:
         """
         Send notification when a security issue is created
@@ -73,14 +569,17 @@ class EmailHandler:
             issue_details: GitHub issue creation results
             analysis_results: AI analysis results
             scan_metadata: Scan context and metadata
-            recipients: Email recipients (uses defaults if not provided)
+            recipients: Email recipients (uses defaults plus admins if not provided)
+            defer: Queue the email for the next flush() instead of sending now
 
         Returns:
             Dictionary with email sending results
         """
         try:
-            print(f"📧 Sending security issue notification for {repo_name}")
+            logger.info("📧 Sending security issue notification for %s", repo_name)
 
+            # Admins are copied on default-routed alerts as a second envelope group
+            admin_recipients = [] if recipients else self._admin_only_recipients
             recipients = recipients or self.default_recipients
             if not recipients:
                 return {"success": False, "error": "No recipients configured"}
@@ -96,16 +595,18 @@ class EmailHandler:
                 recipients=recipients,
                 subject=subject,
                 html_content=html_content,
-                email_type="security_issue"
+                email_type="security_issue",
+                defer=defer,
+                extra_recipients=admin_recipients
             )
 
-            if result["success"]:
-                print(f"✓ Security issue notification sent to {len(recipients)} recipients")
+            if result["success"] and not defer:
+                logger.info("✓ Security issue notification queued for %s recipients", len(recipients))
 
             return result
 
         except Exception as e:
-            print(f"❌ Failed to send security issue notification: {e}")
+            logger.error("❌ Failed to send security issue notification: %s", e)
             return {"success": False, "error": str(e)}
 
     def send_pr_created_notification(
@@ -114,7 +615,8 @@ class EmailHandler:
         pr_details: Dict,
         code_fixes: Dict,
         scan_metadata: Dict,
-        recipients: Optional[List[str]] = None
+        recipients: Optional[List[str]] = None,
+        defer: bool = False
     ) -> Dict:
         """
         Send notification when an automated security fix PR is created
@@ -125,12 +627,13 @@ class EmailHandler:
             code_fixes: AI-generated code fixes
             scan_metadata: Scan context and metadata
             recipients: Email recipients (uses defaults if not provided)
+            defer: Queue the email for the next flush() instead of sending now
 
         Returns:
             Dictionary with email sending results
         """
         try:
-            print(f"📧 Sending PR creation notification for {repo_name}")
+            logger.info("📧 Sending PR creation notification for %s", repo_name)
 
             recipients = recipients or self.default_recipients
             if not recipients:
@@ -147,23 +650,25 @@ class EmailHandler:
                 recipients=recipients,
                 subject=subject,
                 html_content=html_content,
-                email_type="pr_created"
+                email_type="pr_created",
+                defer=defer
             )
 
-            if result["success"]:
-                print(f"✓ PR creation notification sent to {len(recipients)} recipients")
+            if result["success"] and not defer:
+                logger.info("✓ PR creation notification queued for %s recipients", len(recipients))
 
             return result
 
         except Exception as e:
-            print(f"❌ Failed to send PR notification: {e}")
+            logger.error("❌ Failed to send PR notification: %s", e)
             return {"success": False, "error": str(e)}
 
     def send_scan_summary_notification(
         self,
         repo_name: str,
         workflow_results: Dict,
-        recipients: Optional[List[str]] = None
+        recipients: Optional[List[str]] = None,
+        defer: bool = False
     ) -> Dict:
         """
         Send scan summary notification with complete workflow results
@@ -172,20 +677,32 @@ class EmailHandler:
             repo_name: Repository name
             workflow_results: Complete workflow results
             recipients: Email recipients (uses defaults if not provided)
+            defer: Queue the email for the next flush() instead of sending now
 
         Returns:
             Dictionary with email sending results
         """
         try:
-            print(f"📧 Sending scan summary notification for {repo_name}")
+            findings = workflow_results.get("findings", {})
+            total_findings = findings.get("total", 0)
+
+            # Quiet scans (nothing found, nothing opened) are the common case - skip them entirely
+            if (
+                total_findings == 0
+                and not (workflow_results.get("github_issue") or {}).get("success")
+                and not (workflow_results.get("security_fix_pr") or {}).get("success")
+                and not self.notify_on_clean
+            ):
+                logger.info("⏭️ Skipping clean scan summary for %s", repo_name)
+                return {"success": True, "skipped": True, "reason": "no_findings", "email_type": "scan_summary"}
+
+            logger.info("📧 Sending scan summary notification for %s", repo_name)
 
             recipients = recipients or self.default_recipients
             if not recipients:
                 return {"success": False, "error": "No recipients configured"}
 
             # Generate email content
-            findings = workflow_results.get("findings", {})
-            total_findings = findings.get("total", 0)
 
             if total_findings > 0:
                 subject = f"📊 Security Scan Complete: {total_findings} issues found in {repo_name}"
@@ -199,16 +716,17 @@ class EmailHandler:
                 recipients=recipients,
                 subject=subject,
                 html_content=html_content,
-                email_type="scan_summary"
+                email_type="scan_summary",
+                defer=defer
             )
 
-            if result["success"]:
-                print(f"✓ Scan summary notification sent to {len(recipients)} recipients")
+            if result["success"] and not defer:
+                logger.info("✓ Scan summary notification queued for %s recipients", len(recipients))
 
             return result
 
         except Exception as e:
-            print(f"❌ Failed to send scan summary notification: {e}")
+            logger.error("❌ Failed to send scan summary notification: %s", e)
             return {"success": False, "error": str(e)}
 
     def _send_email(
@@ -216,44 +734,204 @@ class EmailHandler:
         recipients: List[str],
         subject: str,
         html_content: str,
-        email_type: str = "notification"
+        email_type: str = "notification",
+        defer: bool = False,
+        extra_recipients: Optional[List[str]] = None
     ) -> Dict:
-        """Send email via SMTP"""
-        try:
-            # Create message
-            message = MIMEMultipart("alternative")
-            message["Subject"] = subject
-            message["From"] = f"{self.sender_name} <{self.sender_email}>"
-            message["To"] = ", ".join(recipients)
+        """
+        Queue email for the background worker, or hold it for flush() when defer is set.
+        extra_recipients get the same message as a separate envelope, without appearing in To:.
+        """
+        recipient_groups = [recipients]
+        if extra_recipients:
+            recipient_groups.append(extra_recipients)
+        all_recipients = [r for group in recipient_groups for r in group]
 
-            # Add HTML content
-            html_part = MIMEText(html_content, "html")
-            message.attach(html_part)
+        try:
+            job = {
+                "to": recipients,
+                "html_content": html_content,
+                "recipient_groups": recipient_groups,
+                "recipients": all_recipients,
+                "subject": subject,
+                "email_type": email_type
+            }
 
-            # Send email
-            context = ssl.create_default_context()
-            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls(context=context)
-                server.login(self.sender_email, self.sender_password)
-                server.sendmail(self.sender_email, recipients, message.as_string())
+            if defer:
+                with self._outbox_lock:
+                    self._outbox.append(job)
+            else:
+                self._queue.put([job])
 
             return {
                 "success": True,
-                "recipients": recipients,
+                "queued": True,
+                "deferred": defer,
+                "recipients": all_recipients,
                 "subject": subject,
-                "email_type": email_type,
-                "sent_at": datetime.now().isoformat()
+                "email_type": email_type
             }
 
         except Exception as e:
-            print(f"❌ SMTP send error: {e}")
+            logger.error("❌ SMTP send error: %s", e)
             return {
                 "success": False,
                 "error": str(e),
-                "recipients": recipients,
+                "recipients": all_recipients,
                 "email_type": email_type
             }
 
+    def flush(self) -> int:
+        """
+        Hand every deferred email to the worker as one batch, sent over a single SMTP session
+
+        Returns:
+            Number of emails queued for sending
+        """
+        with self._outbox_lock:
+            jobs, self._outbox = self._outbox, []
+        if jobs:
+            logger.info("📧 Queued %s email(s) for sending", len(jobs))
+            self._queue.put(jobs)
+        return len(jobs)
+
+    def _build_message(
+        self,
+        recipients: List[str],
+        subject: str,
+        html_content: str,
+        cte: Optional[str] = None
+    ) -> EmailMessage:
+        """Build a multipart/alternative message with a plain-text fallback and the HTML body"""
+        message = EmailMessage()
+        message["Subject"] = subject
+        message["From"] = formataddr((self.sender_name, self.sender_email))
+        message["To"] = self._default_to_header if recipients is self.default_recipients else ", ".join(recipients)
+        message.set_content(f"{subject}\n\nThis notification is formatted as HTML; open it in an HTML-capable mail client.\n")
+        message.add_alternative(html_content, subtype="html", cte=cte)
+        return message
+
+    def _payload(self, job: Dict, eight_bit: bool) -> Tuple[bytes, List[str]]:
+        """
+        Serialize a job's message once (reused for every recipient group) and return it with
+        its MAIL FROM options. When the server supports 8BITMIME the HTML goes out raw instead
+        of being quoted-printable encoded.
+        """
+        eight_bit = eight_bit and max(map(len, job["html_content"].splitlines()), default=0) < 990
+        key = "payload_8bit" if eight_bit else "payload"
+        if key not in job:
+            message = self._build_message(
+                job["to"], job["subject"], job["html_content"], cte="8bit" if eight_bit else None
+            )
+            job[key] = message.as_bytes(policy=message.policy.clone(linesep="\r\n"))
+        return job[key], ["BODY=8BITMIME"] if eight_bit else []
+
+    def _sendmail(self, server: smtplib.SMTP, job: Dict, group: List[str]):
+        payload, mail_options = self._payload(job, server.has_extn("8bitmime"))
+        server.sendmail(self.sender_email, group, payload, mail_options)
+        self._smtp_last_used = time.monotonic()
+
+    def _deliver(self, jobs: List[Dict]) -> List[Dict]:
+        """Send serialized messages over the pooled session. Caller holds _smtp_lock."""
+        results = []
+        for job in jobs:
+            try:
+                for group in job["recipient_groups"]:
+                    try:
+                        self._sendmail(self._get_smtp(), job, group)
+                    except smtplib.SMTPServerDisconnected:
+                        # Retry once on a fresh connection
+                        self._drop_smtp()
+                        self._sendmail(self._get_smtp(), job, group)
+
+                    # Rotate the session before it hits the provider's per-connection cap
+                    self._smtp_msg_count += 1
+                    if self._smtp_msg_count >= self.smtp_max_msgs_per_conn:
+                        self._drop_smtp()
+
+                results.append(self._sent_result(job))
+            except Exception as e:
+                results.append(self._failed_result(job, e))
+        return results
+
+    def _sent_result(self, job: Dict) -> Dict:
+        return {
+            "success": True,
+            "recipients": job["recipients"],
+            "subject": job["subject"],
+            "email_type": job["email_type"],
+            "sent_at": datetime.now().isoformat()
+        }
+
+    def _failed_result(self, job: Dict, error: Exception) -> Dict:
+        logger.error("❌ SMTP send error: %s", error)
+        return {
+            "success": False,
+            "error": str(error),
+            "recipients": job["recipients"],
+            "email_type": job["email_type"]
+        }
+
+    async def aflush(self) -> List[Dict]:
+        """
+        Send every deferred email now over one aiosmtplib session opened for this call.
+        Falls back to the pooled smtplib session in a thread when aiosmtplib is not installed.
+
+        Returns:
+            List of per-email sending results, in the order they were queued
+        """
+        with self._outbox_lock:
+            jobs, self._outbox = self._outbox, []
+        if not jobs:
+            return []
+
+        if aiosmtplib is None:
+            def deliver():
+                with self._smtp_lock:
+                    return self._deliver(jobs)
+            return await asyncio.to_thread(deliver)
+
+        # The session lives only as long as this call, since aiosmtplib binds it to the
+        # running loop; an SMTP session carries one transaction at a time, so sends
+        # over it go one after another
+        try:
+            smtp = await self._aconnect_smtp()
+        except Exception as e:
+            return [self._failed_result(job, e) for job in jobs]
+        try:
+            return [await self._adeliver(smtp, job) for job in jobs]
+        finally:
+            try:
+                await smtp.quit()
+            except Exception:
+                smtp.close()
+
+    async def _aconnect_smtp(self):
+        """Open and authenticate a new aiosmtplib session"""
+        smtp = aiosmtplib.SMTP(
+            hostname=self.smtp_server,
+            port=self.smtp_port,
+            timeout=self.smtp_timeout,
+            start_tls=True
+        )
+        await smtp.connect()
+        try:
+            await smtp.login(self.sender_email, self.sender_password)
+        except Exception:
+            smtp.close()
+            raise
+        return smtp
+
+    async def _adeliver(self, smtp, job: Dict) -> Dict:
+        """Send one serialized message over an aiosmtplib session"""
+        try:
+            payload, mail_options = self._payload(job, smtp.supports_extension("8bitmime"))
+            for group in job["recipient_groups"]:
+                await smtp.sendmail(self.sender_email, group, payload, mail_options=mail_options)
+            return self._sent_result(job)
+        except Exception as e:
+            return self._failed_result(job, e)
+
     def _generate_security_issue_email(
         self,
         repo_name: str,
@@ -263,118 +941,34 @@ class EmailHandler:
     ) -> str:
         """Generate HTML email for security issue notification"""
 
-        issue_url = issue_details.get("issue_url", "#")
-        issue_number = issue_details.get("issue_number", "N/A")
+        generated_at = datetime.now().strftime(_FOOTER_TIME_FORMAT)
         critical_issues = analysis_results.get("critical_issues", [])
-        executive_summary = analysis_results.get("executive_summary", "Security vulnerabilities detected")
 
         # Build critical issues list
-        issues_html = ""
-        for i, issue in enumerate(critical_issues[:5], 1):  # Top 5 issues
+        issues_rows: List[str] = []
+        for issue in critical_issues[:5]:  # Top 5 issues
             severity = issue.get("severity", "UNKNOWN")
-            title = issue.get("title", "Security Issue")
-            file_path = issue.get("file", "unknown")
-            line = issue.get("line", "")
-
-            severity_color = {
-                "CRITICAL": "#dc2626",
-                "HIGH": "#ea580c",
-                "MEDIUM": "#ca8a04",
-                "LOW": "#16a34a"
-            }.get(severity, "#6b7280")
-
-            issues_html += f"""
-            <tr>
-                <td style="padding: 8px; border-bottom: 1px solid #e5e7eb;">
-                    <span style="background: {severity_color}; color: white; padding: 2px 8px; border-radius: 4px; font-size: 12px; font-weight: bold;">
-                        {severity}
-                    </span>
-                </td>
-                <td style="padding: 8px; border-bottom: 1px solid #e5e7eb; font-weight: 500;">{title}</td>
-                <td style="padding: 8px; border-bottom: 1px solid #e5e7eb; color: #6b7280; font-family: monospace; font-size: 13px;">
-                    {file_path}{':' + str(line) if line else ''}
-                </td>
-            </tr>"""
-
-        html_template = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <title>Security Alert - {repo_name}</title>
-        </head>
-        <body style="font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; line-height: 1.6; color: #374151; margin: 0; padding: 0; background-color: #f9fafb;">
-            <div style="max-width: 600px; margin: 0 auto; padding: 20px; background-color: white; border-radius: 8px; box-shadow: 0 1px 3px rgba(0, 0, 0, 0.1);">
-
-                <!-- Header -->
-                <div style="text-align: center; padding: 20px 0; border-bottom: 2px solid #dc2626;">
-                    <h1 style="color: #dc2626; margin: 0; font-size: 24px;">
-                        🚨 Security Alert
-                    </h1>
-                    <p style="color: #6b7280; margin: 5px 0 0 0;">Watchman Security Scanner</p>
-                </div>
-
-                <!-- Summary -->
-                <div style="padding: 20px 0;">
-                    <h2 style="color: #1f2937; margin: 0 0 10px 0;">Security Vulnerabilities Detected</h2>
-                    <p style="margin: 0 0 15px 0;">
-                        <strong>Repository:</strong> {repo_name}<br>
-                        <strong>Branch:</strong> {scan_metadata.get('branch', 'unknown')}<br>
-                        <strong>Scan Time:</strong> {scan_metadata.get('scan_timestamp', 'unknown')}
-                    </p>
-                    <p style="background: #fef3c7; padding: 15px; border-radius: 6px; border-left: 4px solid #f59e0b; margin: 15px 0;">
-                        <strong>Executive Summary:</strong><br>
-                        {executive_summary}
-                    </p>
-                </div>
-
-                <!-- Critical Issues -->
-                <div style="padding: 20px 0;">
-                    <h3 style="color: #1f2937; margin: 0 0 15px 0;">Critical Security Issues</h3>
-                    <table style="width: 100%; border-collapse: collapse; border: 1px solid #e5e7eb; border-radius: 6px; overflow: hidden;">
-                        <thead>
-                            <tr style="background: #f9fafb;">
-                                <th style="padding: 12px 8px; text-align: left; font-weight: 600; color: #374151; border-bottom: 2px solid #e5e7eb;">Severity</th>
-                                <th style="padding: 12px 8px; text-align: left; font-weight: 600; color: #374151; border-bottom: 2px solid #e5e7eb;">Issue</th>
-                                <th style="padding: 12px 8px; text-align: left; font-weight: 600; color: #374151; border-bottom: 2px solid #e5e7eb;">Location</th>
-                            </tr>
-                        </thead>
-                        <tbody>
-                            {issues_html}
-                        </tbody>
-                    </table>
-                </div>
-
-                <!-- Action Required -->
-                <div style="background: #fef2f2; padding: 20px; border-radius: 6px; border-left: 4px solid #dc2626; margin: 20px 0;">
-                    <h3 style="color: #dc2626; margin: 0 0 10px 0;">⚡ Action Required</h3>
-                    <p style="margin: 0 0 15px 0;">
-                        A GitHub issue has been automatically created to track these security vulnerabilities.
-                        Please review and address these issues promptly to maintain your application's security.
-                    </p>
-                    <a href="{issue_url}"
-                       style="display: inline-block; background: #dc2626; color: white; padding: 10px 20px; text-decoration: none; border-radius: 6px; font-weight: 500;">
-                        View GitHub Issue #{issue_number}
-                    </a>
-                </div>
-
-                <!-- Footer -->
-                <div style="text-align: center; padding: 20px 0; border-top: 1px solid #e5e7eb; margin-top: 30px; color: #6b7280; font-size: 14px;">
-                    <p style="margin: 0;">
-                        This notification was automatically generated by<br>
-                        <strong>Watchman Security Scanner</strong> 🛡️
-                    </p>
-                    <p style="margin: 10px 0 0 0; font-size: 12px;">
-                        Scan ID: {scan_metadata.get('scan_run_id', 'N/A')} |
-                        {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-                    </p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-
-        return html_template
+            line = issue.get("line")
+            issues_rows.append(_ISSUE_ROW.format_map({
+                "color": _SEVERITY_COLORS.get(severity, _DEFAULT_SEVERITY_COLOR),
+                "severity": _html(severity),
+                "title": _html(issue.get("title", "Security Issue")),
+                "file": _html(issue.get("file", "unknown")),
+                "line_suffix": f":{_html(line)}" if line else ""
+            }))
+
+        ctx = {
+            "repo_name": _html(repo_name),
+            "branch": _html(scan_metadata.get('branch', 'unknown')),
+            "scan_timestamp": _html(scan_metadata.get('scan_timestamp', 'unknown')),
+            "executive_summary": _html(analysis_results.get("executive_summary", "Security vulnerabilities detected")),
+            "issues_rows": "".join(issues_rows),
+            "issue_url": _href(issue_details.get("issue_url", "#")),
+            "issue_number": _html(issue_details.get("issue_number", "N/A")),
+            "scan_run_id": _html(scan_metadata.get('scan_run_id', 'N/A')),
+            "generated_at": generated_at
+        }
+        return _SECURITY_ISSUE_TMPL.substitute(ctx)
 
     def _generate_pr_created_email(
         self,
@@ -385,240 +979,57 @@ class EmailHandler:
     ) -> str:
         """Generate HTML email for PR creation notification"""
 
-        pr_url = pr_details.get("pr_url", "#")
-        pr_number = pr_details.get("pr_number", "N/A")
-        branch_name = pr_details.get("branch_name", "unknown")
+        generated_at = datetime.now().strftime(_FOOTER_TIME_FORMAT)
         files_changed = pr_details.get("files_changed", [])
-        summary = code_fixes.get("summary", "Security fixes applied")
-
-        # Build files changed list
-        files_html = ""
-        for file_path in files_changed[:10]:  # Show up to 10 files
-            files_html += f"""
-            <li style="padding: 5px 0; font-family: monospace; font-size: 13px; color: #374151;">
-                📄 {file_path}
-            </li>"""
-
-        html_template = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <title>Automated Security Fix - {repo_name}</title>
-        </head>
-        <body style="font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; line-height: 1.6; color: #374151; margin: 0; padding: 0; background-color: #f9fafb;">
-            <div style="max-width: 600px; margin: 0 auto; padding: 20px; background-color: white; border-radius: 8px; box-shadow: 0 1px 3px rgba(0, 0, 0, 0.1);">
-
-                <!-- Header -->
-                <div style="text-align: center; padding: 20px 0; border-bottom: 2px solid #16a34a;">
-                    <h1 style="color: #16a34a; margin: 0; font-size: 24px;">
-                        🔧 Automated Security Fix
-                    </h1>
-                    <p style="color: #6b7280; margin: 5px 0 0 0;">Watchman Security Scanner</p>
-                </div>
 
-                <!-- Summary -->
-                <div style="padding: 20px 0;">
-                    <h2 style="color: #1f2937; margin: 0 0 10px 0;">Security Fix Pull Request Created</h2>
-                    <p style="margin: 0 0 15px 0;">
-                        <strong>Repository:</strong> {repo_name}<br>
-                        <strong>Branch:</strong> {branch_name}<br>
-                        <strong>Files Modified:</strong> {len(files_changed)}
-                    </p>
-                    <p style="background: #dcfce7; padding: 15px; border-radius: 6px; border-left: 4px solid #16a34a; margin: 15px 0;">
-                        <strong>Fixes Applied:</strong><br>
-                        {summary}
-                    </p>
-                </div>
-
-                <!-- Files Changed -->
-                <div style="padding: 20px 0;">
-                    <h3 style="color: #1f2937; margin: 0 0 15px 0;">Files Modified</h3>
-                    <ul style="list-style: none; padding: 0; margin: 0; background: #f9fafb; border-radius: 6px; padding: 15px;">
-                        {files_html}
-                    </ul>
-                </div>
-
-                <!-- Action Required -->
-                <div style="background: #eff6ff; padding: 20px; border-radius: 6px; border-left: 4px solid #3b82f6; margin: 20px 0;">
-                    <h3 style="color: #3b82f6; margin: 0 0 10px 0;">🔍 Review Required</h3>
-                    <p style="margin: 0 0 15px 0;">
-                        An automated security fix pull request has been created. Please review the changes carefully
-                        and test thoroughly before merging to ensure functionality remains intact.
-                    </p>
-                    <a href="{pr_url}"
-                       style="display: inline-block; background: #3b82f6; color: white; padding: 10px 20px; text-decoration: none; border-radius: 6px; font-weight: 500;">
-                        Review Pull Request #{pr_number}
-                    </a>
-                </div>
-
-                <!-- Security Note -->
-                <div style="background: #fefce8; padding: 15px; border-radius: 6px; border-left: 4px solid #eab308; margin: 20px 0; font-size: 14px;">
-                    <strong>⚠️ Important:</strong> While these fixes are AI-generated and designed to address security vulnerabilities,
-                    please verify that all functionality works as expected after applying the changes.
-                </div>
-
-                <!-- Footer -->
-                <div style="text-align: center; padding: 20px 0; border-top: 1px solid #e5e7eb; margin-top: 30px; color: #6b7280; font-size: 14px;">
-                    <p style="margin: 0;">
-                        This pull request was automatically generated by<br>
-                        <strong>Watchman Security Scanner</strong> 🛡️
-                    </p>
-                    <p style="margin: 10px 0 0 0; font-size: 12px;">
-                        Scan ID: {scan_metadata.get('scan_run_id', 'N/A')} |
-                        {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-                    </p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        # Build files changed list (up to 10 files)
+        files_html = "".join(
+            _FILE_ROW_TMPL.substitute(file_path=_html(file_path)) for file_path in files_changed[:10]
+        )
 
-        return html_template
+        ctx = {
+            "repo_name": _html(repo_name),
+            "branch_name": _html(pr_details.get("branch_name", "unknown")),
+            "files_count": len(files_changed),
+            "summary": _html(code_fixes.get("summary", "Security fixes applied")),
+            "files_rows": files_html,
+            "pr_url": _href(pr_details.get("pr_url", "#")),
+            "pr_number": _html(pr_details.get("pr_number", "N/A")),
+            "scan_run_id": _html(scan_metadata.get('scan_run_id', 'N/A')),
+            "generated_at": generated_at
+        }
+        return _PR_CREATED_TMPL.substitute(ctx)
 
     def _generate_scan_summary_email(self, repo_name: str, workflow_results: Dict) -> str:
         """Generate HTML email for scan summary notification"""
 
         findings = workflow_results.get("findings", {})
-        total_findings = findings.get("total", 0)
-        critical_count = findings.get("critical", 0)
-        warnings_count = findings.get("warnings", 0)
-        info_count = findings.get("info", 0)
-        duration = workflow_results.get("duration_seconds", 0)
-
-        github_issue = workflow_results.get("github_issue", {})
-        security_pr = workflow_results.get("security_fix_pr", {})
-
-        # Determine scan status
-        if total_findings == 0:
-            status_color = "#16a34a"
-            status_icon = "✅"
-            status_text = "Clean"
-        elif critical_count > 0:
-            status_color = "#dc2626"
-            status_icon = "🚨"
-            status_text = "Critical Issues Found"
-        else:
-            status_color = "#ea580c"
-            status_icon = "⚠️"
-            status_text = "Issues Found"
-
-        # Build actions section
-        actions_html = ""
-        if github_issue.get("success"):
-            actions_html += f"""
-            <p style="margin: 5px 0;">
-                📋 <strong>GitHub Issue:</strong>
-                <a href="{github_issue.get('issue_url', '#')}" style="color: #3b82f6; text-decoration: none;">
-                    Issue #{github_issue.get('issue_number', 'N/A')}
-                </a>
-            </p>"""
-
-        if security_pr.get("success"):
-            actions_html += f"""
-            <p style="margin: 5px 0;">
-                🔧 <strong>Automated Fix PR:</strong>
-                <a href="{security_pr.get('pr_url', '#')}" style="color: #16a34a; text-decoration: none;">
-                    PR #{security_pr.get('pr_number', 'N/A')}
-                </a>
-            </p>"""
-
-        if not actions_html:
-            actions_html = "<p style='margin: 5px 0; color: #6b7280;'>No actions taken (no significant issues found)</p>"
-
-        html_template = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <title>Security Scan Summary - {repo_name}</title>
-        </head>
-        <body style="font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; line-height: 1.6; color: #374151; margin: 0; padding: 0; background-color: #f9fafb;">
-            <div style="max-width: 600px; margin: 0 auto; padding: 20px; background-color: white; border-radius: 8px; box-shadow: 0 1px 3px rgba(0, 0, 0, 0.1);">
-
-                <!-- Header -->
-                <div style="text-align: center; padding: 20px 0; border-bottom: 2px solid {status_color};">
-                    <h1 style="color: {status_color}; margin: 0; font-size: 24px;">
-                        {status_icon} Scan Complete
-                    </h1>
-                    <p style="color: #6b7280; margin: 5px 0 0 0;">Watchman Security Scanner</p>
-                </div>
-
-                <!-- Summary -->
-                <div style="padding: 20px 0;">
-                    <h2 style="color: #1f2937; margin: 0 0 10px 0;">{status_text}</h2>
-                    <p style="margin: 0 0 15px 0;">
-                        <strong>Repository:</strong> {repo_name}<br>
-                        <strong>Branch:</strong> {workflow_results.get('branch', 'unknown')}<br>
-                        <strong>Scan Duration:</strong> {duration:.1f} seconds<br>
-                        <strong>Completed:</strong> {workflow_results.get('completed_at', 'unknown')}
-                    </p>
-                </div>
-
-                <!-- Findings Summary -->
-                <div style="padding: 20px 0;">
-                    <h3 style="color: #1f2937; margin: 0 0 15px 0;">Security Findings</h3>
-                    <div style="display: grid; grid-template-columns: repeat(2, 1fr); gap: 15px;">
-                        <div style="text-align: center; padding: 15px; background: #fef2f2; border-radius: 6px; border: 1px solid #fecaca;">
-                            <div style="font-size: 24px; font-weight: bold; color: #dc2626;">{critical_count}</div>
-                            <div style="font-size: 12px; color: #6b7280; text-transform: uppercase; font-weight: 500;">Critical</div>
-                        </div>
-                        <div style="text-align: center; padding: 15px; background: #fef3c7; border-radius: 6px; border: 1px solid #fde68a;">
-                            <div style="font-size: 24px; font-weight: bold; color: #ea580c;">{warnings_count}</div>
-                            <div style="font-size: 12px; color: #6b7280; text-transform: uppercase; font-weight: 500;">Warnings</div>
-                        </div>
-                    </div>
-                    <div style="text-align: center; margin-top: 15px; padding: 10px; background: #f9fafb; border-radius: 6px;">
-                        <strong>Total Issues Found: {total_findings}</strong>
-                    </div>
-                </div>
-
-                <!-- Actions Taken -->
-                <div style="padding: 20px 0;">
-                    <h3 style="color: #1f2937; margin: 0 0 15px 0;">Actions Taken</h3>
-                    <div style="background: #f9fafb; padding: 15px; border-radius: 6px; border-left: 4px solid #6b7280;">
-                        {actions_html}
-                    </div>
-                </div>
-
-                <!-- Next Steps -->
-                {f'''
-                <div style="background: #fef3c7; padding: 20px; border-radius: 6px; border-left: 4px solid #f59e0b; margin: 20px 0;">
-                    <h3 style="color: #92400e; margin: 0 0 10px 0;">📋 Next Steps</h3>
-                    <ul style="margin: 0; padding-left: 20px;">
-                        <li>Review all security findings in the GitHub issue</li>
-                        {f"<li>Test and review the automated fix PR before merging</li>" if security_pr.get("success") else ""}
-                        <li>Address any remaining security vulnerabilities</li>
-                        <li>Run additional security tests if needed</li>
-                    </ul>
-                </div>
-                ''' if total_findings > 0 else f'''
-                <div style="background: #dcfce7; padding: 20px; border-radius: 6px; border-left: 4px solid #16a34a; margin: 20px 0;">
-                    <h3 style="color: #166534; margin: 0 0 10px 0;">🎉 Great Job!</h3>
-                    <p style="margin: 0;">No security vulnerabilities were found in this scan. Your code is looking secure!</p>
-                </div>
-                '''}
-
-                <!-- Footer -->
-                <div style="text-align: center; padding: 20px 0; border-top: 1px solid #e5e7eb; margin-top: 30px; color: #6b7280; font-size: 14px;">
-                    <p style="margin: 0;">
-                        This scan summary was automatically generated by<br>
-                        <strong>Watchman Security Scanner</strong> 🛡️
-                    </p>
-                    <p style="margin: 10px 0 0 0; font-size: 12px;">
-                        Workflow ID: {workflow_results.get('workflow_id', 'N/A')} |
-                        Scan ID: {workflow_results.get('scan_run_id', 'N/A')}
-                    </p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-
-        return html_template
+        github_issue = workflow_results.get("github_issue") or {}
+        security_pr = workflow_results.get("security_fix_pr") or {}
+        issue_created = github_issue.get("success")
+        pr_created = security_pr.get("success")
+
+        # Defaults are resolved here so the renderer works on plain values only
+        return _render_scan_summary(
+            repo_name=repo_name,
+            total=findings.get("total", 0),
+            critical=findings.get("critical", 0),
+            warnings=findings.get("warnings", 0),
+            duration=workflow_results.get('duration_seconds', 0),
+            workflow_id=workflow_results.get('workflow_id', 'N/A'),
+            scan_run_id=workflow_results.get('scan_run_id', 'N/A'),
+            branch=workflow_results.get('branch', 'unknown'),
+            completed_at=workflow_results.get('completed_at', 'unknown'),
+            issue_url=github_issue.get('issue_url', '#') if issue_created else None,
+            issue_number=github_issue.get('issue_number', 'N/A') if issue_created else None,
+            pr_url=security_pr.get('pr_url', '#') if pr_created else None,
+            pr_number=security_pr.get('pr_number', 'N/A') if pr_created else None
+        )
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
     # Test the email handler
     try:
         print("🧪 Testing Email Handler")
@@ -1,16 +1,266 @@
 import os
 import json
+import asyncio
+import atexit
+import base64
 import shutil
+import tarfile
 import tempfile
-from typing import Dict, List, Any, Optional
-from datetime import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Any, Optional
+from datetime import datetime, timezone
 from pathlib import Path
-from github import Github, GithubException
-from git import Repo, GitCommandError
+from string import Template
+from urllib.parse import quote
+import httpx
+from github import Github, GithubException, InputGitTreeElement
 from dotenv import load_dotenv
 
 load_dotenv()
 
+GITHUB_API_URL = "https://api.github.com"
+
+# How long a fetched Repository/Issue object is reused before it is fetched again
+_REPO_TTL = 300
+_ISSUE_CACHE_SIZE = 256
+
+# Most-recently-used conditional GET responses kept for their ETags
+_ETAG_CACHE_SIZE = 512
+
+# Labels applied to every Watchman security issue
+_ISSUE_LABELS = ("security", "watchman-scan", "needs-triage")
+
+# Opt-in RAM-backed clone dir (WATCHMAN_CLONE_RAMDIR, e.g. /dev/shm). A checkout can
+# unpack to many times GitHub's packed size, so each clone reserves this multiple of
+# it, and repos whose reservation would exceed the cap always clone to disk
+_RAMDIR_SIZE_FACTOR = 10
+_RAMDIR_MAX_RESERVATION = 512 * 1024 * 1024
+
+# Skip conditional GETs (serve the cached copy) once the core quota drops below this
+_RATE_LIMIT_FLOOR = 50
+
+# Quota read from response headers is trusted this long before /rate_limit is asked again
+_RATE_LIMIT_MAX_AGE = 60
+
+# Severity -> emoji for issue headings; keys are upper-case (see create_security_issue)
+_SEVERITY_EMOJI = {
+    'CRITICAL': '🔴',
+    'HIGH': '🟠',
+    'MEDIUM': '🟡',
+    'LOW': '🔵',
+    'INFO': 'ℹ️'
+}
+_DEFAULT_SEVERITY_EMOJI = '⚠️'
+
+# Issue body templates, parsed once at import. The per-issue section is a plain
+# str.format string, the cheapest fill for the one fragment rendered per finding.
+_ISSUE_HEADER_TMPL = Template("""## 🔒 Watchman Security Scan Report
+
+**Scan Date:** $timestamp
+**Branch:** `$branch`
+**Commit:** `$commit_sha`
+**Analyzer:** Claude AI + Semgrep
+
+---
+
+## 📋 Executive Summary
+
+$executive_summary
+
+""")
+
+_ISSUE_SECTION = """### {index}. {severity_emoji} {title}
+
+**File:** `{file}`
+**Line:** {line}
+**Severity:** {severity}
+
+**Description:**
+{description}
+
+**Business Impact:**
+{business_impact}
+
+**Recommended Fix:**
+```
+{recommended_fix}
+```
+
+**Compliance Standards:**
+{compliance}
+
+---
+
+"""
+
+# Static footer appended to every generated issue body
+_ISSUE_FOOTER = """---
+
+## 🤖 About This Report
+
+This issue was automatically generated by [Watchman](https://github.com/your-org/watchman), an AI-powered security scanning platform that combines static analysis with intelligent remediation recommendations.
+
+**Next Steps:**
+1. Review each critical issue carefully
+2. Implement the recommended fixes
+3. Test your changes thoroughly
+4. Re-run the security scan to verify fixes
+
+**Questions?** Contact your DevSecOps team or create a discussion in this repository.
+
+*Generated by Watchman v1.0 | Powered by Claude AI & Semgrep*
+"""
+
+# Fix PR description fragments (str.format templates)
+_PR_HEADER = """## 🔒 Automated Security Fixes
+
+**Summary:** {summary}
+
+### What was fixed:
+"""
+
+_PR_FILE_ROW = "- **{file_path}**: {description} (fixes {issue_type})\n"
+
+_PR_NEW_FILE_ROW = "- **{file_path}**: {purpose}\n"
+
+_PR_FOOTER = """
+
+### Repository Details:
+- **Repository:** {repo_name}
+- **Branch:** {branch}
+- **Files modified:** {files_modified}
+- **Generated by:** Watchman Security Scanner 🛡️
+
+### Security Impact:
+These changes address critical security vulnerabilities that could potentially:
+- Allow unauthorized access to sensitive data
+- Enable code injection attacks
+- Expose credentials or secrets
+- Lead to cross-site scripting (XSS) attacks
+
+### Testing:
+Please review the changes carefully and test thoroughly before merging:
+1. Verify functionality still works as expected
+2. Run your test suite
+3. Test security improvements manually if possible
+4. Review for any potential breaking changes
+
+---
+*This PR was automatically generated by Watchman Security Scanner. Please review all changes before merging.*
+"""
+
+# GraphQL documents: one round-trip per logical operation instead of several REST calls
+_ISSUE_TARGET_QUERY = """
+query($owner: String!, $name: String!) {
+  repository(owner: $owner, name: $name) {
+    id
+    %s
+  }
+}""" % "\n    ".join(f'l{i}: label(name: "{name}") {{ id }}' for i, name in enumerate(_ISSUE_LABELS))
+
+_CREATE_ISSUE_MUTATION = """
+mutation($input: CreateIssueInput!) {
+  createIssue(input: $input) { issue { number url createdAt } }
+}"""
+
+# Concurrent contents fetches in create_security_fix_pr
+_FETCH_WORKERS = 8
+
+# Aliased operations sent per mutation by bulk_add_comments / close_issues_bulk
+_MUTATION_BATCH = 20
+
+# close_issue reasons mapped onto GraphQL's IssueClosedStateReason
+_CLOSE_STATE_REASONS = {"completed": "COMPLETED", "not_planned": "NOT_PLANNED"}
+
+# GraphQL error types mapped onto the HTTP statuses callers already check for
+_GRAPHQL_ERROR_STATUS = {"NOT_FOUND": 404, "FORBIDDEN": 403, "RATE_LIMITED": 403}
+
+
+def _parallel_rmtree(path, workers: int = 8):
+    """
+    rmtree that overlaps the unlink syscalls across a thread pool: files are unlinked
+    concurrently, then directories are removed deepest-first. Windows uses shutil.rmtree.
+    """
+    if os.name == "nt":
+        shutil.rmtree(path)
+        return
+
+    files, dirs, stack = [], [], [str(path)]
+    while stack:
+        current = stack.pop()
+        dirs.append(current)
+        with os.scandir(current) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                else:
+                    files.append(entry.path)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(os.unlink, files, chunksize=256))
+    for directory in reversed(dirs):
+        os.rmdir(directory)
+
+
+def _stream_graphql_input(query: str, issue_input: Dict, field: str, chunks: Iterator[str]) -> Iterator[bytes]:
+    """
+    Yield the JSON request body {"query", "variables": {"input": {..., field: "<chunks>"}}}
+    piece by piece, escaping each string chunk on its own instead of building the whole value
+    """
+    head = json.dumps({"query": query})[:-1] + ', "variables": {"input": ' + json.dumps(issue_input)[:-1]
+    yield f'{head}, {json.dumps(field)}: "'.encode()
+    for chunk in chunks:
+        yield json.dumps(chunk)[1:-1].encode()
+    yield b'"}}}'
+
+
+class _ByteStreamReader:
+    """Minimal file-like read() over an iterator of byte chunks, for tarfile's stream mode"""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        # bytearray so appends and consumed-prefix deletes don't copy the whole buffer
+        self._buffer = bytearray()
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0 or size >= len(self._buffer):
+            data = bytes(self._buffer)
+            self._buffer.clear()
+        else:
+            data = bytes(self._buffer[:size])
+            del self._buffer[:size]
+        return data
+
+
+class _TokenBucket:
+    """Blocking token bucket: `rate` tokens per second, up to `burst` banked"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, tokens: int = 1):
+        """Take tokens, sleeping until enough have refilled"""
+        with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                time.sleep((tokens - self._tokens) / self.rate)
+
 
 class GitHubHandler:
     """
@@ -24,6 +274,51 @@ class GitHubHandler:
         if not self.token:
             raise ValueError("GITHUB_TOKEN not found in .env")
 
+        # One pooled HTTP/2 client for all direct GraphQL/REST calls; concurrent
+        # requests (see clone_scan_and_cleanup_many) multiplex over one TLS connection
+        self.http = httpx.Client(
+            base_url=GITHUB_API_URL,
+            headers={
+                "Authorization": f"Bearer {self.token}",
+                "Accept": "application/vnd.github+json"
+            },
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=32),
+            timeout=30,
+            event_hooks={"response": [self._record_rate_limit]}
+        )
+        atexit.register(self.close)
+        # repo_name -> (repository node id, label node ids or None if a label is missing)
+        self._issue_targets: Dict[str, tuple] = {}
+        # url -> (etag, parsed JSON, next page url) for conditional GETs; see _get_json()
+        # Optionally persisted to GITHUB_ETAG_CACHE so later runs start with warm ETags
+        self._etag_cache_path = os.path.expanduser(os.getenv('GITHUB_ETAG_CACHE', ''))
+        self._etag_cache: Dict[str, tuple] = self._load_etag_cache()
+        self._etag_lock = threading.Lock()
+        # resource -> (remaining, reset epoch, observed at monotonic); see _record_rate_limit()
+        self._rate_limits: Dict[str, tuple] = {}
+        # repo_name -> (fetched_at, Repository); see _repo()
+        self._repo_cache: Dict[str, tuple] = {}
+        # (repo_name, issue_number) -> (fetched_at, Issue); see _issue()
+        self._issue_cache: Dict[tuple, tuple] = {}
+        # Guards both caches; fetches run outside it (see clone_scan_and_cleanup_many)
+        self._cache_lock = threading.Lock()
+        # Optional bare mirrors reused as --reference object stores across clones
+        self._mirror_dir = os.getenv('WATCHMAN_MIRROR_DIR', '')
+        self._mirror_lock = threading.Lock()
+        # Bytes of WATCHMAN_CLONE_RAMDIR promised to in-flight clones, keyed by clone path
+        self._ramdir_reservations: Dict[str, int] = {}
+        self._ramdir_lock = threading.Lock()
+        # Client-side throttle for content-creating calls (GitHub's secondary rate limits)
+        self._write_bucket = _TokenBucket(
+            rate=float(os.getenv('GITHUB_WRITE_RATE', '1.0')),
+            burst=int(os.getenv('GITHUB_WRITE_BURST', '5'))
+        )
+        # Clone directories still being deleted off the critical path; joined at exit
+        self._cleanup_threads: List[threading.Thread] = []
+        self._cleanup_lock = threading.Lock()
+        atexit.register(self.wait_for_cleanups)
+
         try:
             self.github = Github(self.token)
             # Test the connection
@@ -32,6 +327,246 @@ class GitHubHandler:
         except GithubException as e:
             raise Exception(f"Failed to connect to GitHub API: {e}")
 
+    def close(self):
+        """Close the pooled HTTP client and persist the ETag cache"""
+        self.http.close()
+        self._save_etag_cache()
+
+    def _load_etag_cache(self) -> Dict[str, tuple]:
+        if not self._etag_cache_path or not os.path.exists(self._etag_cache_path):
+            return {}
+        try:
+            with open(self._etag_cache_path, encoding="utf-8") as f:
+                entries = list(json.load(f).items())[-_ETAG_CACHE_SIZE:]
+            return {url: tuple(entry) for url, entry in entries}
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable ETag cache {self._etag_cache_path}: {e}")
+            return {}
+
+    def _save_etag_cache(self):
+        if not self._etag_cache_path:
+            return
+        with self._etag_lock:
+            # Most recently used entries only, so the file can't grow run over run
+            snapshot = dict(list(self._etag_cache.items())[-_ETAG_CACHE_SIZE:])
+        try:
+            # Write-then-rename so a crash never leaves a truncated cache behind
+            tmp_path = f"{self._etag_cache_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, self._etag_cache_path)
+        except OSError as e:
+            print(f"⚠️ Failed to save ETag cache {self._etag_cache_path}: {e}")
+
+    def _graphql(
+        self,
+        query: str,
+        variables: Dict,
+        partial: bool = False,
+        stream: Optional[Callable[[], Iterator[bytes]]] = None
+    ) -> Dict:
+        """
+        Run a GraphQL query and return its data. Failures are raised as GithubException
+        so callers keep their existing error handling. With partial=True, per-field errors
+        are tolerated and the failed aliases simply come back as None. `stream` replaces
+        the JSON-encoded query/variables with a factory for a streamed request body.
+        """
+        def send():
+            if stream is not None:
+                return self.http.post("/graphql", content=stream())
+            return self.http.post("/graphql", json={"query": query, "variables": variables})
+
+        if query.lstrip().startswith("mutation"):
+            self._write_bucket.consume()
+        response = send()
+        retry_after = response.headers.get("Retry-After")
+        if response.status_code in (403, 429) and retry_after is not None:
+            # Secondary rate limit: wait as instructed and try once more
+            print(f"⏳ GitHub asked us to back off for {retry_after}s")
+            time.sleep(float(retry_after))
+            response = send()
+        if response.status_code != 200:
+            raise GithubException(response.status_code, response.text, dict(response.headers))
+
+        payload = response.json()
+        errors = payload.get("errors")
+        if errors and not (partial and payload.get("data")):
+            status = _GRAPHQL_ERROR_STATUS.get(errors[0].get("type"), 422)
+            raise GithubException(status, errors, dict(response.headers), errors[0].get("message"))
+        return payload["data"]
+
+    def _get_json(self, url: str, params: Optional[Dict] = None) -> tuple:
+        """
+        Conditional REST GET. Re-sends the stored ETag as If-None-Match so unchanged
+        resources come back as a free 304; returns (parsed JSON, next page URL).
+        """
+        request = self.http.build_request("GET", url, params=params)
+        key = str(request.url)
+        with self._etag_lock:
+            cached = self._etag_cache.get(key)
+
+        # Nearly out of quota: serve what we have rather than spend the last requests
+        core = self._rate_limits.get("core")
+        if (
+            cached is not None
+            and core is not None
+            and core[0] < _RATE_LIMIT_FLOOR
+            and time.time() < core[1]
+        ):
+            return cached[1], cached[2]
+
+        if cached is not None:
+            request.headers["If-None-Match"] = cached[0]
+        response = self.http.send(request)
+
+        if response.status_code == 304 and cached is not None:
+            return cached[1], cached[2]
+        if response.status_code != 200:
+            raise GithubException(response.status_code, response.text, dict(response.headers))
+
+        data = response.json()
+        next_url = response.links.get("next", {}).get("url")
+        etag = response.headers.get("ETag")
+        if etag:
+            with self._etag_lock:
+                # Re-insert at the end so the dict's order is least- to most-recently used
+                self._etag_cache.pop(key, None)
+                self._etag_cache[key] = (etag, data, next_url)
+                while len(self._etag_cache) > _ETAG_CACHE_SIZE:
+                    del self._etag_cache[next(iter(self._etag_cache))]
+        return data, next_url
+
+    def _make_clone_dir(self, size_kb: int) -> str:
+        """
+        New temp directory for a clone of roughly size_kb. Uses WATCHMAN_CLONE_RAMDIR
+        when set and it still has room after the space promised to in-flight clones;
+        the check and the reservation happen under one lock so concurrent clones
+        can't all claim the same free space. Released by _release_clone_dir().
+        """
+        ramdir = os.getenv("WATCHMAN_CLONE_RAMDIR", "")
+        needed = size_kb * 1024 * _RAMDIR_SIZE_FACTOR
+        if ramdir and os.path.isdir(ramdir) and needed <= _RAMDIR_MAX_RESERVATION:
+            with self._ramdir_lock:
+                try:
+                    available = shutil.disk_usage(ramdir).free - sum(self._ramdir_reservations.values())
+                except OSError:
+                    available = 0
+                if available > needed:
+                    temp_dir = tempfile.mkdtemp(prefix="watchman_clone_", dir=ramdir)
+                    self._ramdir_reservations[temp_dir] = needed
+                    return temp_dir
+        return tempfile.mkdtemp(prefix="watchman_clone_")
+
+    def _release_clone_dir(self, local_path: str):
+        """Return the RAM dir space reserved for the clone at local_path, if any"""
+        with self._ramdir_lock:
+            self._ramdir_reservations.pop(os.path.dirname(os.path.normpath(local_path)), None)
+
+    def _record_rate_limit(self, response: httpx.Response):
+        """Response hook: remember the quota GitHub reports on every API response"""
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        if remaining is None:
+            return
+        resource = response.headers.get("X-RateLimit-Resource", "core")
+        reset = float(response.headers.get("X-RateLimit-Reset", 0))
+        self._rate_limits[resource] = (int(remaining), reset, time.monotonic())
+
+    def _rate_limit_status(self) -> Optional[Dict]:
+        """Quota per resource from GET /rate_limit (the call itself is not counted)"""
+        try:
+            response = self.http.get("/rate_limit")
+            if response.status_code != 200:
+                return None
+            resources = response.json()["resources"]
+        except (httpx.HTTPError, ValueError, KeyError):
+            return None
+
+        now = time.monotonic()
+        for name, status in resources.items():
+            self._rate_limits[name] = (status["remaining"], float(status["reset"]), now)
+        return resources
+
+    def _rate_limit_preflight(self, resource: str = "core") -> Optional[Dict]:
+        """
+        Error result if `resource` has fewer than _RATE_LIMIT_FLOOR requests left, else None.
+        Uses the quota from recent response headers; /rate_limit is only asked when that is
+        missing, older than _RATE_LIMIT_MAX_AGE or past its reset. An unreachable
+        /rate_limit never blocks the caller.
+        """
+        cached = self._rate_limits.get(resource)
+        if (
+            cached is None
+            or time.monotonic() - cached[2] > _RATE_LIMIT_MAX_AGE
+            or time.time() >= cached[1]
+        ):
+            self._rate_limit_status()
+            cached = self._rate_limits.get(resource)
+        if cached is None or cached[0] >= _RATE_LIMIT_FLOOR:
+            return None
+
+        remaining, reset, _ = cached
+        retry_after = max(0, int(reset - time.time()))
+        print(f"⏳ GitHub {resource} quota nearly exhausted ({remaining} left), retry in {retry_after}s")
+        return {
+            "success": False,
+            "error": "rate-limited",
+            "error_type": "rate_limited",
+            "retry_after": retry_after
+        }
+
+    def _repo(self, repo_name: str):
+        """PyGithub Repository for repo_name, reused for _REPO_TTL seconds"""
+        now = time.monotonic()
+        with self._cache_lock:
+            cached = self._repo_cache.get(repo_name)
+        if cached is not None and now - cached[0] < _REPO_TTL:
+            return cached[1]
+
+        repo = self.github.get_repo(repo_name)
+        with self._cache_lock:
+            self._repo_cache[repo_name] = (now, repo)
+        return repo
+
+    def _issue(self, repo_name: str, issue_number: int):
+        """PyGithub Issue, reused for _REPO_TTL seconds like _repo()"""
+        key = (repo_name, issue_number)
+        now = time.monotonic()
+        with self._cache_lock:
+            cached = self._issue_cache.get(key)
+        if cached is not None and now - cached[0] < _REPO_TTL:
+            return cached[1]
+
+        issue = self._repo(repo_name).get_issue(issue_number)
+        with self._cache_lock:
+            if len(self._issue_cache) >= _ISSUE_CACHE_SIZE:
+                # Drop expired entries before growing past the bound
+                self._issue_cache = {
+                    k: v for k, v in self._issue_cache.items() if now - v[0] < _REPO_TTL
+                }
+            self._issue_cache[key] = (now, issue)
+        return issue
+
+    def invalidate_repo(self, repo_name: str):
+        """Drop cached metadata for repo_name (e.g. after changing its settings)"""
+        with self._cache_lock:
+            self._repo_cache.pop(repo_name, None)
+            self._issue_cache = {k: v for k, v in self._issue_cache.items() if k[0] != repo_name}
+        self._issue_targets.pop(repo_name, None)
+
+    @staticmethod
+    def _split_repo_name(repo_name: str) -> Dict:
+        owner, _, name = repo_name.partition("/")
+        return {"owner": owner, "name": name}
+
+    def _issue_target(self, repo_name: str) -> tuple:
+        """Repository and label node ids for createIssue, fetched once per repo"""
+        if repo_name not in self._issue_targets:
+            repo = self._graphql(_ISSUE_TARGET_QUERY, self._split_repo_name(repo_name))["repository"]
+            labels = [repo.get(f"l{i}") for i in range(len(_ISSUE_LABELS))]
+            label_ids = [label["id"] for label in labels] if all(labels) else None
+            self._issue_targets[repo_name] = (repo["id"], label_ids)
+        return self._issue_targets[repo_name]
+
     def create_security_issue(
         self,
         repo_name: str,
@@ -52,27 +587,62 @@ class GitHubHandler:
         try:
             print(f"🔍 Creating security issue for {repo_name}")
 
-            repo = self.github.get_repo(repo_name)
+            # createIssue and the label lookup both go through GraphQL
+            rate_limited = self._rate_limit_preflight("graphql")
+            if rate_limited:
+                return rate_limited
+
+            # Normalize severities once so per-issue lookups can skip .upper(); copies,
+            # since the caller's issue dicts are reused for email and storage
+            analysis_results = {
+                **analysis_results,
+                "critical_issues": [
+                    {**issue, "severity": str(issue.get('severity', 'MEDIUM')).upper()}
+                    for issue in analysis_results.get('critical_issues', [])
+                ]
+            }
 
-            # Generate issue title and body
+            # Generate issue title; the body is rendered while the request is sent
             title = self._generate_issue_title(analysis_results)
-            body = self._generate_issue_body(analysis_results, scan_metadata)
 
-            # Create the issue
-            issue = repo.create_issue(
-                title=title,
-                body=body,
-                labels=["security", "watchman-scan", "needs-triage"]
-            )
-
-            print(f"✓ Created GitHub issue #{issue.number}")
+            repository_id, label_ids = self._issue_target(repo_name)
+            if label_ids is not None:
+                # Single createIssue mutation against the cached repository id
+                issue_input = {
+                    "repositoryId": repository_id,
+                    "title": title,
+                    "labelIds": label_ids
+                }
+                issue = self._graphql(
+                    _CREATE_ISSUE_MUTATION,
+                    {"input": issue_input},
+                    stream=lambda: _stream_graphql_input(
+                        _CREATE_ISSUE_MUTATION,
+                        issue_input,
+                        "body",
+                        self._iter_issue_body(analysis_results, scan_metadata)
+                    )
+                )["createIssue"]["issue"]
+                issue_number, issue_url, created_at = issue["number"], issue["url"], issue["createdAt"]
+            else:
+                # GraphQL can only attach existing labels; REST creates missing ones
+                self._write_bucket.consume()
+                issue = self._repo(repo_name).create_issue(
+                    title=title,
+                    body=self._generate_issue_body(analysis_results, scan_metadata),
+                    labels=list(_ISSUE_LABELS)
+                )
+                issue_number, issue_url, created_at = issue.number, issue.html_url, issue.created_at.isoformat()
+                self._issue_targets.pop(repo_name, None)
+
+            print(f"✓ Created GitHub issue #{issue_number}")
 
             return {
                 "success": True,
-                "issue_number": issue.number,
-                "issue_url": issue.html_url,
+                "issue_number": issue_number,
+                "issue_url": issue_url,
                 "title": title,
-                "created_at": issue.created_at.isoformat()
+                "created_at": created_at
             }
 
         except GithubException as e:
@@ -92,119 +662,88 @@ class GitHubHandler:
     def _generate_issue_title(self, analysis_results: Dict) -> str:
         """Generate a descriptive title for the security issue"""
         critical_count = len(analysis_results.get('critical_issues', []))
-        total_findings = len([
-            item for sublist in analysis_results.get('by_severity', {}).values()
-            for item in sublist
-        ]) if 'by_severity' in analysis_results else critical_count
+        total_findings = sum(
+            len(findings) for findings in analysis_results['by_severity'].values()
+        ) if 'by_severity' in analysis_results else critical_count
 
         if critical_count > 0:
             return f"🚨 Security Alert: {critical_count} Critical Issues Found ({total_findings} total findings)"
         else:
             return f"⚠️ Security Review: {total_findings} Security Issues Detected"
 
+    @staticmethod
+    def _scan_instant(metadata: Dict) -> datetime:
+        """
+        The scan's own timestamp (metadata['scan_timestamp']) in UTC, so the issue, the fix
+        branch and the logs all name the same instant; now() if it is missing or unparseable
+        """
+        try:
+            # Naive timestamps are local time, as produced by datetime.now().isoformat()
+            return datetime.fromisoformat(metadata['scan_timestamp']).astimezone(timezone.utc)
+        except (KeyError, TypeError, ValueError):
+            return datetime.now(timezone.utc)
+
     def _generate_issue_body(self, analysis_results: Dict, scan_metadata: Dict) -> str:
         """Generate detailed issue body with findings and recommendations"""
+        return "".join(self._iter_issue_body(analysis_results, scan_metadata))
+
+    def _iter_issue_body(self, analysis_results: Dict, scan_metadata: Dict) -> Iterator[str]:
+        """Yield the issue body fragment by fragment, so it can be streamed into a request"""
 
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S UTC")
+        timestamp = self._scan_instant(scan_metadata).strftime("%Y-%m-%d %H:%M:%S UTC")
         commit_sha = scan_metadata.get('commit_sha', 'unknown')[:8]
         branch = scan_metadata.get('branch', 'unknown')
 
-        # Start with header
-        body = f"""## 🔒 Watchman Security Scan Report
-
-**Scan Date:** {timestamp}
-**Branch:** `{branch}`
-**Commit:** `{commit_sha}`
-**Analyzer:** Claude AI + Semgrep
-
----
-
-## 📋 Executive Summary
-
-{analysis_results.get('executive_summary', 'Security analysis completed')}
-
-"""
+        yield _ISSUE_HEADER_TMPL.substitute(
+            timestamp=timestamp,
+            branch=branch,
+            commit_sha=commit_sha,
+            executive_summary=analysis_results.get('executive_summary', 'Security analysis completed')
+        )
 
         # Add critical issues section
         critical_issues = analysis_results.get('critical_issues', [])
         if critical_issues:
-            body += "## 🚨 Critical Issues\n\n"
+            yield "## 🚨 Critical Issues\n\n"
 
             for i, issue in enumerate(critical_issues, 1):
-                severity_emoji = self._get_severity_emoji(issue.get('severity', 'MEDIUM'))
-
-                body += f"""### {i}. {severity_emoji} {issue.get('title', 'Security Issue')}
-
-**File:** `{issue.get('file', 'unknown')}`
-**Line:** {issue.get('line', 'N/A')}
-**Severity:** {issue.get('severity', 'MEDIUM')}
-
-**Description:**
-{issue.get('description', 'Security vulnerability detected')}
-
-**Business Impact:**
-{issue.get('business_impact', 'Potential security risk')}
-
-**Recommended Fix:**
-```
-{issue.get('recommended_fix', 'Review and remediate according to best practices')}
-```
-
-**Compliance Standards:**
-{', '.join(issue.get('compliance_mapping', []))}
-
----
-
-"""
+                severity = issue.get('severity', 'MEDIUM')
+                yield _ISSUE_SECTION.format(
+                    index=i,
+                    severity_emoji=_SEVERITY_EMOJI.get(severity, _DEFAULT_SEVERITY_EMOJI),
+                    title=issue.get('title', 'Security Issue'),
+                    file=issue.get('file', 'unknown'),
+                    line=issue.get('line', 'N/A'),
+                    severity=severity,
+                    description=issue.get('description', 'Security vulnerability detected'),
+                    business_impact=issue.get('business_impact', 'Potential security risk'),
+                    recommended_fix=issue.get('recommended_fix', 'Review and remediate according to best practices'),
+                    compliance=', '.join(issue.get('compliance_mapping', []))
+                )
 
         # Add recommended actions
         actions = analysis_results.get('recommended_actions', [])
         if actions:
-            body += "## 🔧 Recommended Actions\n\n"
+            yield "## 🔧 Recommended Actions\n\n"
             for i, action in enumerate(actions, 1):
-                body += f"{i}. {action}\n"
-            body += "\n"
+                yield f"{i}. {action}\n"
+            yield "\n"
 
         # Add suggested tools
         tools = analysis_results.get('tools_to_use', [])
         if tools:
-            body += "## 🛠️ Suggested Security Tools\n\n"
+            yield "## 🛠️ Suggested Security Tools\n\n"
             for tool in tools:
                 priority = tool.get('priority', 'N/A')
                 tool_name = tool.get('tool', 'Unknown')
-                body += f"- **{tool_name}** (Priority: {priority})\n"
-            body += "\n"
+                yield f"- **{tool_name}** (Priority: {priority})\n"
+            yield "\n"
 
-        # Add footer
-        body += """---
-
-## 🤖 About This Report
-
-This issue was automatically generated by [Watchman](https://github.com/your-org/watchman), an AI-powered security scanning platform that combines static analysis with intelligent remediation recommendations.
-
-**Next Steps:**
-1. Review each critical issue carefully
-2. Implement the recommended fixes
-3. Test your changes thoroughly
-4. Re-run the security scan to verify fixes
-
-**Questions?** Contact your DevSecOps team or create a discussion in this repository.
-
-*Generated by Watchman v1.0 | Powered by Claude AI & Semgrep*
-"""
-
-        return body
+        yield _ISSUE_FOOTER
 
     def _get_severity_emoji(self, severity: str) -> str:
-        """Get emoji for severity level"""
-        emoji_map = {
-            'CRITICAL': '🔴',
-            'HIGH': '🟠',
-            'MEDIUM': '🟡',
-            'LOW': '🔵',
-            'INFO': 'ℹ️'
-        }
-        return emoji_map.get(severity.upper(), '⚠️')
+        """Get emoji for an upper-case severity level"""
+        return _SEVERITY_EMOJI.get(severity, _DEFAULT_SEVERITY_EMOJI)
 
     def add_comment_to_issue(
         self,
@@ -223,10 +762,14 @@ This issue was automatically generated by [Watchman](https://github.com/your-org
         Returns:
             Dictionary with comment details and status
         """
+        rate_limited = self._rate_limit_preflight()
+        if rate_limited:
+            return rate_limited
+
         try:
-            repo = self.github.get_repo(repo_name)
-            issue = repo.get_issue(issue_number)
+            issue = self._issue(repo_name, issue_number)
 
+            self._write_bucket.consume()
             comment_obj = issue.create_comment(comment)
 
             return {
@@ -243,6 +786,82 @@ This issue was automatically generated by [Watchman](https://github.com/your-org
                 "error_code": getattr(e, 'status', None)
             }
 
+    def _issue_node_ids(self, repo_name: str, numbers: List[int]) -> Dict[int, Optional[str]]:
+        """Node id for each issue number (None if missing), resolved in one aliased query"""
+        numbers = sorted(set(numbers))
+        aliases = " ".join(f"i{n}: issue(number: {n}) {{ id }}" for n in numbers)
+        repo = self._graphql(
+            f"query($owner: String!, $name: String!) {{ repository(owner: $owner, name: $name) {{ {aliases} }} }}",
+            self._split_repo_name(repo_name),
+            partial=True
+        )["repository"] or {}
+        return {n: (repo.get(f"i{n}") or {}).get("id") for n in numbers}
+
+    def bulk_add_comments(
+        self,
+        repo_name: str,
+        comments: List[tuple]
+    ) -> List[Dict]:
+        """
+        Add many comments with aliased GraphQL addComment mutations
+
+        Args:
+            repo_name: Repository name in format "owner/repo"
+            comments: (issue_number, comment) pairs
+
+        Returns:
+            One add_comment_to_issue-style result per comment, in input order
+        """
+        results: List[Dict] = [None] * len(comments)
+
+        try:
+            subject_ids = self._issue_node_ids(repo_name, [number for number, _ in comments])
+        except GithubException as e:
+            error = {"success": False, "error": str(e), "error_code": getattr(e, 'status', None)}
+            return [dict(error) for _ in comments]
+
+        pending = []
+        for index, (number, body) in enumerate(comments):
+            if subject_ids[number] is None:
+                results[index] = {"success": False, "error": f"Issue #{number} not found", "error_code": 404}
+            else:
+                pending.append((index, subject_ids[number], body))
+
+        for start in range(0, len(pending), _MUTATION_BATCH):
+            batch = pending[start:start + _MUTATION_BATCH]
+            params = ", ".join(f"$s{i}: ID!, $b{i}: String!" for i in range(len(batch)))
+            fields = " ".join(
+                f"c{i}: addComment(input: {{subjectId: $s{i}, body: $b{i}}}) "
+                f"{{ commentEdge {{ node {{ databaseId url createdAt }} }} }}"
+                for i in range(len(batch))
+            )
+            variables = {}
+            for i, (_, subject_id, body) in enumerate(batch):
+                variables[f"s{i}"] = subject_id
+                variables[f"b{i}"] = body
+
+            try:
+                data = self._graphql(f"mutation({params}) {{ {fields} }}", variables, partial=True)
+            except GithubException as e:
+                for index, _, _ in batch:
+                    results[index] = {"success": False, "error": str(e), "error_code": getattr(e, 'status', None)}
+                continue
+
+            for i, (index, _, _) in enumerate(batch):
+                added = data.get(f"c{i}")
+                if added is None:
+                    results[index] = {"success": False, "error": "addComment failed", "error_code": 422}
+                    continue
+                node = added["commentEdge"]["node"]
+                results[index] = {
+                    "success": True,
+                    "comment_id": node["databaseId"],
+                    "comment_url": node["url"],
+                    "created_at": node["createdAt"]
+                }
+
+        return results
+
     def close_issue(
         self,
         repo_name: str,
@@ -260,28 +879,73 @@ This issue was automatically generated by [Watchman](https://github.com/your-org
         Returns:
             Dictionary with status
         """
-        try:
-            repo = self.github.get_repo(repo_name)
-            issue = repo.get_issue(issue_number)
+        return self.close_issues_bulk(repo_name, [(issue_number, reason)])[0]
 
-            # Add closing comment
-            closing_comment = f"🔒 Security issues have been resolved. Issue closed by Watchman.\n\nReason: {reason}"
-            issue.create_comment(closing_comment)
+    def close_issues_bulk(
+        self,
+        repo_name: str,
+        items: List[tuple]
+    ) -> List[Dict]:
+        """
+        Comment on and close many issues, one aliased addComment + closeIssue pair per
+        issue and _MUTATION_BATCH issues per GraphQL request
 
-            # Close the issue
-            issue.edit(state="closed")
+        Args:
+            repo_name: Repository name in format "owner/repo"
+            items: (issue_number, reason) pairs; reason is "completed" or "not_planned"
 
-            return {
-                "success": True,
-                "closed_at": datetime.now().isoformat(),
-                "reason": reason
-            }
+        Returns:
+            One close_issue-style result per item, in input order
+        """
+        results: List[Dict] = [None] * len(items)
 
+        try:
+            issue_ids = self._issue_node_ids(repo_name, [number for number, _ in items])
         except GithubException as e:
-            return {
-                "success": False,
-                "error": str(e)
-            }
+            return [{"success": False, "error": str(e)} for _ in items]
+
+        pending = []
+        for index, (number, reason) in enumerate(items):
+            if issue_ids[number] is None:
+                results[index] = {"success": False, "error": f"Issue #{number} not found"}
+            else:
+                pending.append((index, issue_ids[number], reason))
+
+        for start in range(0, len(pending), _MUTATION_BATCH):
+            batch = pending[start:start + _MUTATION_BATCH]
+            params = ", ".join(
+                f"$s{i}: ID!, $b{i}: String!, $r{i}: IssueClosedStateReason!" for i in range(len(batch))
+            )
+            fields = " ".join(
+                f"c{i}: addComment(input: {{subjectId: $s{i}, body: $b{i}}}) {{ clientMutationId }} "
+                f"x{i}: closeIssue(input: {{issueId: $s{i}, stateReason: $r{i}}}) {{ issue {{ closedAt }} }}"
+                for i in range(len(batch))
+            )
+            variables = {}
+            for i, (_, issue_id, reason) in enumerate(batch):
+                variables[f"s{i}"] = issue_id
+                variables[f"b{i}"] = f"🔒 Security issues have been resolved. Issue closed by Watchman.\n\nReason: {reason}"
+                variables[f"r{i}"] = _CLOSE_STATE_REASONS.get(reason, "COMPLETED")
+
+            try:
+                data = self._graphql(f"mutation({params}) {{ {fields} }}", variables, partial=True)
+            except GithubException as e:
+                for index, _, _ in batch:
+                    results[index] = {"success": False, "error": str(e)}
+                continue
+
+            for i, (index, _, reason) in enumerate(batch):
+                closed = data.get(f"x{i}")
+                if closed is None:
+                    results[index] = {"success": False, "error": "closeIssue failed"}
+                    continue
+                results[index] = {
+                    "success": True,
+                    "closed_at": closed["issue"]["closedAt"],
+                    "reason": reason
+                }
+
+        return results
 
     def get_repository_info(self, repo_name: str) -> Dict:
         """
@@ -294,19 +958,19 @@ This issue was automatically generated by [Watchman](https://github.com/your-org
             Dictionary with repository details
         """
         try:
-            repo = self.github.get_repo(repo_name)
+            repo, _ = self._get_json(f"/repos/{repo_name}")
 
             return {
-                "name": repo.name,
-                "full_name": repo.full_name,
-                "description": repo.description,
-                "default_branch": repo.default_branch,
-                "language": repo.language,
-                "private": repo.private,
-                "url": repo.html_url,
-                "clone_url": repo.clone_url,
-                "created_at": repo.created_at.isoformat(),
-                "updated_at": repo.updated_at.isoformat()
+                "name": repo["name"],
+                "full_name": repo["full_name"],
+                "description": repo["description"],
+                "default_branch": repo["default_branch"],
+                "language": repo["language"],
+                "private": repo["private"],
+                "url": repo["html_url"],
+                "clone_url": repo["clone_url"],
+                "created_at": repo["created_at"],
+                "updated_at": repo["updated_at"]
             }
 
         except GithubException as e:
@@ -315,42 +979,55 @@ This issue was automatically generated by [Watchman](https://github.com/your-org
                 "error_code": getattr(e, 'status', None)
             }
 
-    def list_open_security_issues(self, repo_name: str) -> List[Dict]:
+    def list_open_security_issues(self, repo_name: str, limit: Optional[int] = None) -> Iterator[Dict]:
         """
-        List all open security issues created by Watchman
+        List open security issues created by Watchman, fetching pages lazily
 
         Args:
             repo_name: Repository name in format "owner/repo"
+            limit: Stop after this many issues (optional, all if not provided)
 
         Returns:
-            List of issue dictionaries
+            Iterator of issue dictionaries; wrap in list() to materialize
         """
+        if limit is not None and limit <= 0:
+            return
+
         try:
-            repo = self.github.get_repo(repo_name)
-            issues = repo.get_issues(state="open", labels=["watchman-scan"])
-
-            issue_list = []
-            for issue in issues:
-                issue_list.append({
-                    "number": issue.number,
-                    "title": issue.title,
-                    "url": issue.html_url,
-                    "created_at": issue.created_at.isoformat(),
-                    "updated_at": issue.updated_at.isoformat(),
-                    "labels": [label.name for label in issue.labels]
-                })
-
-            return issue_list
+            issues, next_url = self._get_json(
+                f"/repos/{repo_name}/issues",
+                {"state": "open", "labels": "watchman-scan", "per_page": min(limit or 100, 100)}
+            )
+            yielded = 0
+            while True:
+                for issue in issues:
+                    yield {
+                        "number": issue["number"],
+                        "title": issue["title"],
+                        "url": issue["html_url"],
+                        "created_at": issue["created_at"],
+                        "updated_at": issue["updated_at"],
+                        "labels": [label["name"] for label in issue["labels"]]
+                    }
+                    yielded += 1
+                    if yielded == limit:
+                        return
+
+                if not next_url:
+                    break
+                issues, next_url = self._get_json(next_url)
 
         except GithubException as e:
             print(f"❌ Failed to list issues: {e}")
-            return []
 
     def clone_repository(
         self,
         repo_name: str,
         branch: str = "main",
-        clone_path: Optional[str] = None
+        clone_path: Optional[str] = None,
+        sparse_paths: Optional[List[str]] = None,
+        mode: str = "clone",
+        checkout: bool = True
     ) -> Dict:
         """
         Clone a GitHub repository to local filesystem for scanning
@@ -359,41 +1036,79 @@ This issue was automatically generated by [Watchman](https://github.com/your-org
             repo_name: Repository name in format "owner/repo"
             branch: Git branch to clone (default: main)
             clone_path: Local path to clone to (optional, uses temp dir if not provided)
+            sparse_paths: Directories to check out (optional, whole tree if not provided)
+            mode: "clone" for a git working copy, "archive" for a plain file tree at HEAD
+                  (no .git directory; sparse_paths is ignored)
+            checkout: False leaves the working tree empty in "clone" mode; read files
+                      with read_blob(), which fetches each blob on demand
 
         Returns:
             Dictionary with clone status and local path
         """
+        # GitPython costs ~70ms to import, so only the clone paths load it
+        from git import Repo, GitCommandError
+
+        local_path = None
         try:
             print(f"📥 Cloning repository: {repo_name} (branch: {branch})")
 
+            rate_limited = self._rate_limit_preflight()
+            if rate_limited:
+                return rate_limited
+
             # Get repository info first
-            repo = self.github.get_repo(repo_name)
+            repo = self._repo(repo_name)
             clone_url = repo.clone_url
 
             # Determine local path
             if clone_path is None:
-                temp_dir = tempfile.mkdtemp(prefix="watchman_clone_")
-                local_path = Path(temp_dir) / repo.name
+                local_path = Path(self._make_clone_dir(repo.size)) / repo.name
             else:
                 local_path = Path(clone_path)
                 local_path.parent.mkdir(parents=True, exist_ok=True)
 
-            # Remove existing directory if it exists
+            # Move any existing directory aside and delete it in the background
             if local_path.exists():
-                shutil.rmtree(local_path)
-
-            # Clone the repository
-            cloned_repo = Repo.clone_from(
-                clone_url,
-                local_path,
-                branch=branch,
-                depth=1  # Shallow clone for faster operation
-            )
+                stale_path = local_path.with_name(f".{local_path.name}.{time.time_ns()}.stale")
+                local_path.rename(stale_path)
+                self.cleanup_clone_in_background(str(stale_path))
 
-            # Get commit information
-            commit = cloned_repo.head.commit
-            commit_sha = commit.hexsha
-            commit_message = commit.message.strip()
+            if mode == "archive":
+                commit_sha, commit_message = self._download_tarball(repo_name, branch, local_path)
+            else:
+                mirror_path = self._ensure_mirror(repo_name, clone_url)
+                if mirror_path:
+                    # Objects come from the local mirror; --dissociate copies what the
+                    # clone needs so the mirror can be refetched or pruned underneath it
+                    clone_options = ["--reference", mirror_path, "--dissociate"]
+                else:
+                    # Partial clone: fetch commit/tree objects only, then let the
+                    # checkout pull just the blobs it actually writes to the working tree
+                    clone_options = ["--filter=blob:none"]
+                cloned_repo = Repo.clone_from(
+                    clone_url,
+                    local_path,
+                    # protocol.version=2 for filtered ref advertisement on older git; set via
+                    # GIT_CONFIG_* since GitPython rejects -c as an unsafe clone option
+                    env={
+                        **os.environ,
+                        "GIT_CONFIG_COUNT": "1",
+                        "GIT_CONFIG_KEY_0": "protocol.version",
+                        "GIT_CONFIG_VALUE_0": "2",
+                    },
+                    branch=branch,
+                    depth=1,
+                    multi_options=clone_options + ["--single-branch", "--no-tags", "--no-checkout"]
+                )
+                if checkout:
+                    if sparse_paths:
+                        cloned_repo.git.sparse_checkout("set", "--cone", *sparse_paths)
+                    cloned_repo.git.checkout(branch)
+
+                # Get commit information
+                commit = cloned_repo.head.commit
+                commit_sha = commit.hexsha
+                commit_message = commit.message.strip()
 
             print(f"✓ Repository cloned successfully to: {local_path}")
             print(f"✓ Latest commit: {commit_sha[:8]} - {commit_message}")
@@ -415,6 +1130,8 @@ This issue was automatically generated by [Watchman](https://github.com/your-org
 
         except GitCommandError as e:
             print(f"❌ Git clone failed: {e}")
+            if local_path is not None:
+                self._release_clone_dir(str(local_path))
             return {
                 "success": False,
                 "error": f"Git error: {e}",
@@ -422,6 +1139,8 @@ This issue was automatically generated by [Watchman](https://github.com/your-org
             }
         except GithubException as e:
             print(f"❌ GitHub API error: {e}")
+            if local_path is not None:
+                self._release_clone_dir(str(local_path))
             return {
                 "success": False,
                 "error": f"GitHub API error: {e}",
@@ -429,12 +1148,80 @@ This issue was automatically generated by [Watchman](https://github.com/your-org
             }
         except Exception as e:
             print(f"❌ Unexpected error during clone: {e}")
+            if local_path is not None:
+                self._release_clone_dir(str(local_path))
             return {
                 "success": False,
                 "error": str(e),
                 "error_type": "unexpected_error"
             }
 
+    @staticmethod
+    def read_blob(local_path: str, file_path: str, rev: str = "HEAD") -> bytes:
+        """
+        Contents of file_path at rev straight from the clone's object database, for clones
+        made with checkout=False. Blobs missing from a partial clone are fetched lazily.
+        """
+        from git import Repo
+
+        blob = Repo(local_path).commit(rev).tree / file_path
+        return blob.data_stream.read()
+
+    def _ensure_mirror(self, repo_name: str, clone_url: str) -> Optional[str]:
+        """
+        Create or refresh the bare mirror of repo_name under WATCHMAN_MIRROR_DIR.
+        Returns its path, or None when mirrors are disabled or the refresh failed.
+        """
+        if not self._mirror_dir:
+            return None
+        from git import Repo, GitCommandError
+
+        mirror_path = Path(self._mirror_dir).expanduser() / f"{repo_name}.git"
+        try:
+            with self._mirror_lock:
+                if mirror_path.exists():
+                    mirror = Repo(mirror_path)
+                    mirror.git.fetch("--prune")
+                    mirror.git.gc("--auto")
+                else:
+                    print(f"🪞 Creating mirror for {repo_name}: {mirror_path}")
+                    mirror_path.parent.mkdir(parents=True, exist_ok=True)
+                    Repo.clone_from(clone_url, mirror_path, mirror=True)
+            return str(mirror_path)
+        except GitCommandError as e:
+            print(f"⚠️ Mirror unavailable for {repo_name}, cloning without it: {e}")
+            return None
+
+    def _download_tarball(self, repo_name: str, branch: str, local_path: Path) -> tuple:
+        """
+        Stream the branch tarball from the REST API straight into local_path (git archive
+        --remote is not served over HTTPS). Returns (commit_sha, commit_message).
+        """
+        # Resolve the branch first so the files and the reported SHA always match
+        commit, _ = self._get_json(f"/repos/{repo_name}/commits/{branch}")
+        commit_sha = commit["sha"]
+
+        local_path.mkdir(parents=True)
+        extract_args = {"filter": "data"} if hasattr(tarfile, "data_filter") else {}
+        with self.http.stream(
+            "GET", f"/repos/{repo_name}/tarball/{commit_sha}", follow_redirects=True
+        ) as response:
+            if response.status_code != 200:
+                response.read()
+                raise GithubException(response.status_code, response.text, dict(response.headers))
+
+            with tarfile.open(fileobj=_ByteStreamReader(response.iter_bytes()), mode="r|gz") as tar:
+                for member in tar:
+                    # Drop GitHub's "<owner>-<repo>-<sha>/" top-level directory
+                    member.name = member.name.partition("/")[2]
+                    if not member.name:
+                        continue
+                    if member.islnk():
+                        member.linkname = member.linkname.partition("/")[2]
+                    tar.extract(member, local_path, **extract_args)
+
+        return commit_sha, commit["commit"]["message"].strip()
+
     def cleanup_clone(self, local_path: str) -> bool:
         """
         Clean up cloned repository directory
@@ -447,19 +1234,35 @@ This issue was automatically generated by [Watchman](https://github.com/your-org
         """
         try:
             if os.path.exists(local_path):
-                shutil.rmtree(local_path)
+                _parallel_rmtree(local_path)
                 print(f"🧹 Cleaned up cloned repository: {local_path}")
-                return True
+            self._release_clone_dir(local_path)
             return True
         except Exception as e:
             print(f"⚠️ Failed to cleanup {local_path}: {e}")
             return False
 
+    def cleanup_clone_in_background(self, local_path: str):
+        """Run cleanup_clone on a background thread; see wait_for_cleanups()"""
+        thread = threading.Thread(target=self.cleanup_clone, args=(local_path,), daemon=True)
+        with self._cleanup_lock:
+            self._cleanup_threads = [t for t in self._cleanup_threads if t.is_alive()]
+            self._cleanup_threads.append(thread)
+        thread.start()
+
+    def wait_for_cleanups(self):
+        """Block until every background cleanup has finished"""
+        with self._cleanup_lock:
+            threads, self._cleanup_threads = self._cleanup_threads, []
+        for thread in threads:
+            thread.join()
+
     def clone_scan_and_cleanup(
         self,
         repo_name: str,
         scanner,
-        branch: str = "main"
+        branch: str = "main",
+        mode: str = "archive"
     ) -> Dict:
         """
         Complete workflow: clone repository, scan it, and cleanup
@@ -468,11 +1271,13 @@ This issue was automatically generated by [Watchman](https://github.com/your-org
             repo_name: Repository name in format "owner/repo"
             scanner: SecurityScanner instance
             branch: Git branch to scan
+            mode: clone_repository mode; the scan only needs the files at HEAD, so the
+                  default "archive" skips writing a .git directory
 
         Returns:
             Dictionary with scan results and metadata
         """
-        clone_result = self.clone_repository(repo_name, branch)
+        clone_result = self.clone_repository(repo_name, branch, mode=mode)
 
         if not clone_result["success"]:
             return {
@@ -512,8 +1317,40 @@ This issue was automatically generated by [Watchman](https://github.com/your-org
             }
 
         finally:
-            # Always cleanup, even if scan fails
-            self.cleanup_clone(local_path)
+            # Always cleanup, even if scan fails; the results don't wait for it
+            self.cleanup_clone_in_background(local_path)
+
+    async def clone_scan_and_cleanup_many(
+        self,
+        repo_names: List[str],
+        scanner,
+        branch: str = "main",
+        concurrency: int = 8,
+        mode: str = "archive"
+    ) -> Dict[str, Dict]:
+        """
+        Run clone_scan_and_cleanup for several repositories concurrently
+
+        Args:
+            repo_names: Repository names in format "owner/repo"
+            scanner: SecurityScanner instance
+            branch: Git branch to scan
+            concurrency: Maximum number of repositories in flight at once
+            mode: clone_repository mode passed through to clone_scan_and_cleanup
+
+        Returns:
+            Dictionary mapping each repo name to its clone_scan_and_cleanup result
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(repo_name: str) -> Dict:
+            async with semaphore:
+                return await asyncio.to_thread(
+                    self.clone_scan_and_cleanup, repo_name, scanner, branch, mode
+                )
+
+        results = await asyncio.gather(*(run(name) for name in repo_names))
+        return dict(zip(repo_names, results))
 
     def create_security_fix_pr(
         self,
@@ -535,68 +1372,49 @@ This issue was automatically generated by [Watchman](https://github.com/your-org
         try:
             print(f"🔧 Creating security fix PR for {repo_name}")
 
-            repo = self.github.get_repo(repo_name)
+            repo = self._repo(repo_name)
 
             # Get default branch
             default_branch = repo.default_branch
             print(f"📍 Base branch: {default_branch}")
 
-            # Create a new branch for the security fixes
-            branch_name = f"security-fixes-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+            # Branch the security fixes will be committed to
+            branch_name = f"security-fixes-{self._scan_instant(analysis_metadata).strftime('%Y%m%d-%H%M%S')}"
 
             # Get the latest commit on default branch
             base_commit = repo.get_branch(default_branch).commit
 
-            # Create new branch
-            repo.create_git_ref(f"refs/heads/{branch_name}", base_commit.sha)
-            print(f"✓ Created branch: {branch_name}")
-
-            # Apply file changes
+            # Group changes by path so each file is fetched and rewritten exactly once,
+            # with every change's line numbers referring to the original content
+            grouped = self._group_file_changes(code_fixes.get('file_changes', []))
+            paths = list(grouped)
+
+            # Fetch every target file concurrently up front, overlapped with the base
+            # tree's file modes (needed whenever an existing file is rewritten)
+            base_tree = base_commit.commit.tree
+            with ThreadPoolExecutor(max_workers=_FETCH_WORKERS) as pool:
+                modes_future = pool.submit(self._tree_modes, repo, base_tree.sha) if paths else None
+                files = dict(zip(paths, pool.map(
+                    lambda path: self._fetch_file(repo_name, path, base_commit.sha), paths
+                )))
+
+            # Apply file changes in memory; everything is committed at once below
             files_changed = []
-            for file_change in code_fixes.get('file_changes', []):
-                file_path = file_change.get('file_path')
-                changes = file_change.get('changes', [])
-
-                if not file_path or not changes:
-                    continue
-
+            commit_lines = []
+            new_contents: Dict[str, str] = {}
+            for file_path, group in grouped.items():
                 try:
-                    # Get current file content
-                    try:
-                        file_content = repo.get_contents(file_path, ref=branch_name)
-                        current_content = file_content.decoded_content.decode('utf-8')
-                    except GithubException as e:
-                        if e.status == 404:
-                            # File doesn't exist, create it
-                            current_content = ""
-                            file_content = None
-                        else:
-                            raise
-
-                    # Apply changes to content
-                    modified_content = self._apply_code_changes(current_content, changes)
-
-                    # Update or create file
-                    commit_message = f"security: fix {file_change.get('issue_type', 'vulnerability')} in {file_path}"
-
-                    if file_content:
-                        # Update existing file
-                        repo.update_file(
-                            file_path,
-                            commit_message,
-                            modified_content,
-                            file_content.sha,
-                            branch=branch_name
-                        )
-                    else:
-                        # Create new file
-                        repo.create_file(
-                            file_path,
-                            commit_message,
-                            modified_content,
-                            branch=branch_name
-                        )
+                    # Current file content and blob sha (None if the file doesn't exist yet)
+                    fetched = files[file_path]
+                    if isinstance(fetched, Exception):
+                        raise fetched
+                    current_content, _ = fetched
+
+                    # Apply all of this file's changes in one pass
+                    new_contents[file_path] = self._apply_code_changes(current_content, group["changes"])
 
+                    issue_types = ', '.join(group['issue_types']) or 'vulnerability'
+                    commit_lines.append(f"- fix {issue_types} in {file_path}")
                     files_changed.append(file_path)
                     print(f"✓ Updated: {file_path}")
 
@@ -610,17 +1428,10 @@ This issue was automatically generated by [Watchman](https://github.com/your-org
                 content = additional_file.get('content')
 
                 if file_path and content:
-                    try:
-                        repo.create_file(
-                            file_path,
-                            f"security: add {file_path}",
-                            content,
-                            branch=branch_name
-                        )
-                        files_changed.append(file_path)
-                        print(f"✓ Created: {file_path}")
-                    except Exception as e:
-                        print(f"⚠️ Failed to create {file_path}: {e}")
+                    new_contents[file_path] = content
+                    commit_lines.append(f"- add {file_path}")
+                    files_changed.append(file_path)
+                    print(f"✓ Created: {file_path}")
 
             if not files_changed:
                 print("⚠️ No files were successfully changed")
@@ -630,11 +1441,31 @@ This issue was automatically generated by [Watchman](https://github.com/your-org
                     "branch_name": branch_name
                 }
 
+            # One tree + one commit on top of the base, then create the branch at that
+            # commit: three writes however many files changed
+            modes = modes_future.result() if modes_future else {}
+            elements = [
+                InputGitTreeElement(path, modes.get(path, "100644"), "blob", content=content)
+                for path, content in new_contents.items()
+            ]
+            commit_message = code_fixes.get('commit_message') or "security: apply automated security fixes"
+
+            self._write_bucket.consume()
+            tree = repo.create_git_tree(elements, base_tree)
+            self._write_bucket.consume()
+            commit = repo.create_git_commit(
+                f"{commit_message}\n\n" + "\n".join(commit_lines), tree, [base_commit.commit]
+            )
+            self._write_bucket.consume()
+            repo.create_git_ref(f"refs/heads/{branch_name}", commit.sha)
+            print(f"✓ Created branch: {branch_name} ({len(new_contents)} files in one commit)")
+
             # Create PR title and body
             pr_title = f"🔒 Security: {code_fixes.get('summary', 'Fix security vulnerabilities')}"
             pr_body = self._generate_pr_body(code_fixes, analysis_metadata, files_changed)
 
             # Create the Pull Request
+            self._write_bucket.consume()
             pr = repo.create_pull(
                 title=pr_title,
                 body=pr_body,
@@ -644,6 +1475,7 @@ This issue was automatically generated by [Watchman](https://github.com/your-org
 
             # Add labels
             try:
+                self._write_bucket.consume()
                 pr.add_to_labels("security", "automated-fix", "watchman")
             except Exception as e:
                 print(f"⚠️ Could not add labels: {e}")
@@ -674,6 +1506,62 @@ This issue was automatically generated by [Watchman](https://github.com/your-org
                 "error": str(e)
             }
 
+    @staticmethod
+    def _group_file_changes(file_changes: List[Dict]) -> Dict[str, Dict]:
+        """
+        file_path -> {"changes", "descriptions", "issue_types"} merged across every entry
+        for that path, in first-seen order; entries without a path or changes are dropped
+        """
+        grouped: Dict[str, Dict] = {}
+        for file_change in file_changes:
+            if not file_change.get('file_path') or not file_change.get('changes'):
+                continue
+            group = grouped.setdefault(
+                file_change['file_path'], {"changes": [], "descriptions": [], "issue_types": []}
+            )
+            group["changes"].extend(file_change['changes'])
+            for key, value in (("descriptions", file_change.get('description')),
+                               ("issue_types", file_change.get('issue_type'))):
+                if value and value not in group[key]:
+                    group[key].append(value)
+        return grouped
+
+    @staticmethod
+    def _tree_modes(repo, tree_sha: str) -> Dict[str, str]:
+        """path -> git file mode for the tree, so rewritten files keep e.g. their exec bit"""
+        try:
+            return {element.path: element.mode for element in repo.get_git_tree(tree_sha, recursive=True).tree}
+        except GithubException as e:
+            print(f"⚠️ Could not read file modes, defaulting to 100644: {e}")
+            return {}
+
+    def _fetch_file(self, repo_name: str, file_path: str, ref: str):
+        """
+        (text, blob sha) of file_path at ref, ("", None) if it doesn't exist. Errors are
+        returned rather than raised so one bad path doesn't abort a concurrent batch.
+        """
+        try:
+            response = self.http.get(
+                f"/repos/{repo_name}/contents/{quote(file_path)}", params={"ref": ref}
+            )
+            if response.status_code == 404:
+                return "", None
+            if response.status_code != 200:
+                raise GithubException(response.status_code, response.text, dict(response.headers))
+            data = response.json()
+            if data.get("encoding") != "base64":
+                # Files over 1 MB come back with empty content; read them through the
+                # blobs API instead of mistaking them for an empty file
+                blob = self.http.get(f"/repos/{repo_name}/git/blobs/{data['sha']}")
+                if blob.status_code != 200:
+                    raise GithubException(blob.status_code, blob.text, dict(blob.headers))
+                data = {**blob.json(), "sha": data["sha"]}
+                if data.get("encoding") != "base64":
+                    raise ValueError(f"Unsupported content encoding for {file_path}: {data.get('encoding')}")
+            return base64.b64decode(data["content"]).decode('utf-8'), data["sha"]
+        except Exception as e:
+            return e
+
     def _apply_code_changes(self, original_content: str, changes: List[Dict]) -> str:
         """
         Apply a list of code changes to file content
@@ -690,84 +1578,69 @@ This issue was automatically generated by [Watchman](https://github.com/your-org
             return "\n".join([change.get('new_code', '') for change in changes])
 
         lines = original_content.split('\n')
+        line_count = len(lines)
 
-        # Sort changes by line number (descending) to apply from bottom up
-        sorted_changes = sorted(changes, key=lambda x: x.get('line_start', 0), reverse=True)
-
-        for change in sorted_changes:
+        # Single forward pass: copy untouched ranges and new code into one output list
+        output: List[str] = []
+        pos = 0
+        for change in sorted(changes, key=lambda x: x.get('line_start', 0)):
             line_start = change.get('line_start', 1) - 1  # Convert to 0-based indexing
             line_end = change.get('line_end', line_start + 1) - 1
             new_code = change.get('new_code', '')
 
             # Ensure line numbers are valid
-            line_start = max(0, min(line_start, len(lines)))
-            line_end = max(line_start, min(line_end, len(lines)))
+            line_start = max(0, min(line_start, line_count))
+            line_end = max(line_start, min(line_end, line_count))
 
-            # Split new code into lines
-            new_lines = new_code.split('\n') if new_code else ['']
+            if line_start < pos:
+                print(f"⚠️ Skipping change at line {line_start + 1}: overlaps a previous change")
+                continue
 
-            # Replace the range of lines
-            lines[line_start:line_end + 1] = new_lines
+            output.extend(lines[pos:line_start])
+            output.extend(new_code.split('\n') if new_code else [''])
+            pos = min(line_end + 1, line_count)
 
-        return '\n'.join(lines)
+        output.extend(lines[pos:])
+        return '\n'.join(output)
 
     def _generate_pr_body(self, code_fixes: Dict, analysis_metadata: Dict, files_changed: List[str]) -> str:
         """Generate PR description for security fixes"""
 
-        summary = code_fixes.get('summary', 'Security vulnerability fixes')
-        commit_msg = code_fixes.get('commit_message', '')
-
-        body = f"""## 🔒 Automated Security Fixes
-
-**Summary:** {summary}
-
-### What was fixed:
-"""
-
-        # List each file change
-        for file_change in code_fixes.get('file_changes', []):
-            issue_type = file_change.get('issue_type', 'unknown')
-            description = file_change.get('description', 'Security improvement')
-            file_path = file_change.get('file_path', 'unknown')
-
-            body += f"- **{file_path}**: {description} (fixes {issue_type})\n"
+        parts: List[str] = [_PR_HEADER.format(
+            summary=code_fixes.get('summary', 'Security vulnerability fixes')
+        )]
+
+        # One row per file that was actually changed, merging duplicate entries
+        changed = set(files_changed)
+        grouped = self._group_file_changes(code_fixes.get('file_changes', []))
+        for file_path, group in grouped.items():
+            if file_path not in changed:
+                continue
+            parts.append(_PR_FILE_ROW.format(
+                file_path=file_path,
+                description="; ".join(group['descriptions']) or 'Security improvement',
+                issue_type=", ".join(group['issue_types']) or 'unknown'
+            ))
 
         # Add additional files if any
-        additional_files = code_fixes.get('additional_files', [])
+        additional_files = [
+            additional_file for additional_file in code_fixes.get('additional_files', [])
+            if additional_file.get('file_path') in changed
+        ]
         if additional_files:
-            body += f"\n### New files added:\n"
+            parts.append("\n### New files added:\n")
             for additional_file in additional_files:
-                file_path = additional_file.get('file_path', 'unknown')
-                purpose = additional_file.get('purpose', 'Security configuration')
-                body += f"- **{file_path}**: {purpose}\n"
-
-        body += f"""
-
-### Repository Details:
-- **Repository:** {analysis_metadata.get('repo_name', 'unknown')}
-- **Branch:** {analysis_metadata.get('branch', 'unknown')}
-- **Files modified:** {len(files_changed)}
-- **Generated by:** Watchman Security Scanner 🛡️
-
-### Security Impact:
-These changes address critical security vulnerabilities that could potentially:
-- Allow unauthorized access to sensitive data
-- Enable code injection attacks
-- Expose credentials or secrets
-- Lead to cross-site scripting (XSS) attacks
-
-### Testing:
-Please review the changes carefully and test thoroughly before merging:
-1. Verify functionality still works as expected
-2. Run your test suite
-3. Test security improvements manually if possible
-4. Review for any potential breaking changes
-
----
-*This PR was automatically generated by Watchman Security Scanner. Please review all changes before merging.*
-"""
-
-        return body
+                parts.append(_PR_NEW_FILE_ROW.format(
+                    file_path=additional_file.get('file_path', 'unknown'),
+                    purpose=additional_file.get('purpose', 'Security configuration')
+                ))
+
+        parts.append(_PR_FOOTER.format(
+            repo_name=analysis_metadata.get('repo_name', 'unknown'),
+            branch=analysis_metadata.get('branch', 'unknown'),
+            files_modified=len(files_changed)
+        ))
+        return "".join(parts)
 
 
 if __name__ == "__main__":
@@ -1,5 +1,6 @@
 import os
 import asyncio
+import logging
 from typing import Dict, Any, Optional
 from datetime import datetime
 from contextlib import asynccontextmanager
@@ -12,6 +13,9 @@ import uvicorn
 
 from orchestrator import WatchmanOrchestrator, extract_webhook_data
 
+# Surface module loggers (e.g. the Claude client) alongside the print output
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+
 
 # Pydantic models for request/response validation
 class WebhookPayload(BaseModel):
@@ -6,7 +6,7 @@ from datetime import datetime
 from pathlib import Path
 
 from scanner import SecurityScanner
-from bedrock_agent import BedrockAgentCore
+from bedrock_agent import get_agent
 from github_handler import GitHubHandler
 from database import DatabaseHandler
 from email_handler import EmailHandler
@@ -26,7 +26,7 @@ class WatchmanOrchestrator:
         try:
             # Initialize components
             self.scanner = SecurityScanner()
-            self.ai_agent = BedrockAgentCore()  # Claude AI
+            self.ai_agent = get_agent()  # Claude AI (shared instance)
             self.github_handler = GitHubHandler()
             self.database = DatabaseHandler()
 
@@ -187,8 +187,9 @@ class WatchmanOrchestrator:
             #     print(f"✓ Vanta compliance log: Security findings recorded")
 
             # Step 4: Create GitHub Issue (if significant findings)
+            # Same criterion as the analysis' clean fast path: INFO-only scans are clean
             github_issue_result = None
-            if scan_results.get("total_findings", 0) > 0:
+            if findings_by_severity.get("ERROR") or findings_by_severity.get("WARNING"):
                 print(f"📋 Step 4: Creating GitHub issue...")
 
                 scan_metadata = {
@@ -217,10 +218,11 @@ class WatchmanOrchestrator:
                                 repo_name=repo_full_name,
                                 issue_details=github_issue_result,
                                 analysis_results=analysis_results,
-                                scan_metadata=scan_metadata
+                                scan_metadata=scan_metadata,
+                                defer=True  # sent with the scan summary
                             )
                             if email_result.get("success"):
-                                print(f"✓ Security issue email sent to {len(email_result.get('recipients', []))} recipients")
+                                print(f"✓ Security issue email queued for {len(email_result.get('recipients', []))} recipients")
                             else:
                                 print(f"⚠️ Failed to send security issue email: {email_result.get('error')}")
                         except Exception as e:
@@ -272,10 +274,11 @@ class WatchmanOrchestrator:
                                     repo_name=repo_full_name,
                                     pr_details=pr_result,
                                     code_fixes=code_fixes,
-                                    scan_metadata=scan_metadata
+                                    scan_metadata=scan_metadata,
+                                    defer=True  # sent with the scan summary
                                 )
                                 if pr_email_result.get("success"):
-                                    print(f"✓ Security fix PR email sent to {len(pr_email_result.get('recipients', []))} recipients")
+                                    print(f"✓ Security fix PR email queued for {len(pr_email_result.get('recipients', []))} recipients")
                                 else:
                                     print(f"⚠️ Failed to send PR email: {pr_email_result.get('error')}")
                             except Exception as e:
@@ -377,12 +380,14 @@ class WatchmanOrchestrator:
                 try:
                     summary_email_result = self.email_handler.send_scan_summary_notification(
                         repo_name=repo_full_name,
-                        workflow_results=workflow_result
+                        workflow_results=workflow_result,
+                        defer=True
                     )
-                    if summary_email_result.get("success"):
-                        print(f"✓ Scan summary email sent to {len(summary_email_result.get('recipients', []))} recipients")
-                    else:
-                        print(f"⚠️ Failed to send scan summary email: {summary_email_result.get('error')}")
+                    if not summary_email_result.get("success"):
+                        print(f"⚠️ Failed to build scan summary email: {summary_email_result.get('error')}")
+
+                    # Send the issue, PR and summary emails over one SMTP session (in the background)
+                    self.email_handler.flush()
                 except Exception as e:
                     print(f"⚠️ Summary email notification error: {e}")
 
@@ -423,6 +428,13 @@ class WatchmanOrchestrator:
             # except Exception as vanta_error:
             #     print(f"⚠️ Failed to log scan failure to Vanta: {vanta_error}")
 
+            # Don't hold back notifications queued before the failure
+            if self.email_handler:
+                try:
+                    self.email_handler.flush()
+                except Exception as email_error:
+                    print(f"⚠️ Failed to flush queued emails: {email_error}")
+
             # Cleanup if clone was successful
             if 'local_path' in locals():
                 try:
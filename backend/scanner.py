@@ -85,25 +85,30 @@ class SecurityScanner:
         findings_list = raw_findings.get("results", [])
         results["total_findings"] = len(findings_list)
 
+        # Hoist lookups out of the loop; large repos can produce 10k+ findings
+        by_severity = results["by_severity"]
+        empty = {}
+
         for finding in findings_list:
-            extra = finding.get("extra", {})
+            extra = finding.get("extra", empty)
+            metadata = extra.get("metadata", empty)
             severity = extra.get("severity", "INFO").upper()
 
-            if severity not in results["by_severity"]:
+            bucket = by_severity.get(severity)
+            if bucket is None:
                 severity = "INFO"
+                bucket = by_severity["INFO"]
 
-            vuln = {
+            bucket.append({
                 "rule_id": finding.get("check_id", "unknown"),
                 "message": extra.get("message", "No description"),
                 "file": finding.get("path", "unknown"),
-                "line": finding.get("start", {}).get("line", 0),
+                "line": finding.get("start", empty).get("line", 0),
                 "code_snippet": extra.get("lines", ""),
                 "severity": severity,
-                "cwe": extra.get("metadata", {}).get("cwe", []),
-                "owasp": extra.get("metadata", {}).get("owasp", [])
-            }
-
-            results["by_severity"][severity].append(vuln)
+                "cwe": metadata.get("cwe", []),
+                "owasp": metadata.get("owasp", [])
+            })
 
         error_count = len(results["by_severity"]["ERROR"])
         warning_count = len(results["by_severity"]["WARNING"])